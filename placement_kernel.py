@@ -0,0 +1,335 @@
+"""
+Array kernels for scoring candidate room positions.
+
+Candidates and placed rooms are passed as float64 arrays of
+(x, y, width, height) rows and regions as (x1, y1, x2, y2) rows, so region
+coordinates such as the 0.7-scaled H-shape corners are handled exactly.
+Numba is used when it is installed; otherwise an equivalent NumPy
+implementation is used.
+
+The serial kernels are compiled for fixed C-contiguous float64 signatures
+when this module is imported, so with the on-disk cache in place the first
+placement does not wait for type inference; importing the module once
+after installing warms the cache. With parallel=True the sweep over
+candidates is split across threads (NUMBA_NUM_THREADS caps how many). The
+TBB threading layer is avoided because its pool keeps the process from
+exiting once a kernel has run on a QThread.
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+    if numba.config.THREADING_LAYER == "default":
+        numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# The workqueue layer does not support concurrent launches, so parallel
+# kernels are run one at a time
+_PARALLEL_LOCK = threading.Lock()
+
+# Signatures of the serial kernels and their helpers. Division follows
+# NumPy semantics, as in the fallback, and fastmath is left off because the
+# edge tests rely on exact float comparisons. The kernels release the GIL,
+# so previews scoring on worker threads run side by side.
+_RECTS = "float64[:, ::1]"
+_FIRST_OVERLAPS_SIG = f"intp[::1]({_RECTS}, {_RECTS})"
+_SCORE_CANDIDATE_SIG = f"Tuple((boolean, float64))({_RECTS}, intp, {_RECTS}, float64[::1])"
+_SCORE_CANDIDATES_SIG = f"Tuple((boolean[::1], float64[::1]))({_RECTS}, {_RECTS}, float64[::1])"
+_FIT_ONE_SIG = f"float64({_RECTS}, intp, {_RECTS}, intp)"
+_FIT_RECT_SIG = f"void({_RECTS}, intp, {_RECTS}, {_RECTS})"
+_REGION_FIT_SCORES_SIG = f"{_RECTS}({_RECTS}, {_RECTS})"
+_SCORE_PLACEMENTS_SIG = (f"Tuple((boolean[::1], float64[::1], float64[::1]))"
+                         f"({_RECTS}, {_RECTS}, {_RECTS}, float64[::1])")
+_JIT_OPTIONS = dict(cache=True, nogil=True, error_model="numpy")
+
+
+def _as_rects(array):
+    """Return array as the C-contiguous float64 layout the kernels are compiled for"""
+    return np.ascontiguousarray(array, dtype=np.float64)
+
+
+def _edge_tests(a, b):
+    """Broadcast the are_adjacent / Room.overlaps edge tests of a against b"""
+    ax, ay, aw, ah = (a[:, i:i + 1] for i in range(4))
+    bx, by, bw, bh = (b[:, i] for i in range(4))
+
+    x_touch = (ax + aw == bx) | (bx + bw == ax)
+    y_touch = (ay + ah == by) | (by + bh == ay)
+    x_overlap = ~((ax + aw <= bx) | (bx + bw <= ax))
+    y_overlap = ~((ay + ah <= by) | (by + bh <= ay))
+    adjacent = np.where(x_touch, y_overlap, y_touch & x_overlap)
+    return adjacent, x_overlap & y_overlap
+
+
+def pairwise_adjacent(a, b):
+    """
+    Adjacency of every rectangle in a to every rectangle in b.
+
+    Args:
+        a: (m, 4) float64 array of (x, y, width, height)
+        b: (p, 4) float64 array of (x, y, width, height)
+
+    Returns:
+        (m, p) bool array, matching are_adjacent for each pair
+    """
+    return _edge_tests(a, b)[0]
+
+
+def _first_overlaps_np(a, b):
+    """NumPy version of first_overlaps, broadcasting a against b"""
+    if len(b) == 0:
+        return np.full(len(a), -1)
+    overlapping = _edge_tests(a, b)[1]
+    return np.where(overlapping.any(axis=1), overlapping.argmax(axis=1), -1)
+
+
+if NUMBA_AVAILABLE:
+    @njit(_FIRST_OVERLAPS_SIG, **_JIT_OPTIONS)
+    def _first_overlaps_nb(a, b):
+        """Numba version of first_overlaps, stopping at the first overlap"""
+        first = np.full(a.shape[0], -1, dtype=np.intp)
+        for i in range(a.shape[0]):
+            ax, ay, aw, ah = a[i, 0], a[i, 1], a[i, 2], a[i, 3]
+            for j in range(b.shape[0]):
+                bx, by, bw, bh = b[j, 0], b[j, 1], b[j, 2], b[j, 3]
+                if not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay):
+                    first[i] = j
+                    break
+        return first
+
+
+def first_overlaps(a, b):
+    """
+    Index of the first rectangle in b that each rectangle in a overlaps.
+
+    Args:
+        a: (m, 4) float64 array of (x, y, width, height)
+        b: (p, 4) float64 array of (x, y, width, height)
+
+    Returns:
+        (m,) int array with the lowest overlapped index in b, or -1
+    """
+    if NUMBA_AVAILABLE:
+        return _first_overlaps_nb(_as_rects(a), _as_rects(b))
+    return _first_overlaps_np(a, b)
+
+
+def _score_candidates_np(candidates, placed, weights):
+    """NumPy version of score_candidates, broadcasting candidates against placed rooms"""
+    adjacent, overlapping = _edge_tests(candidates, placed)
+    overlaps = overlapping.any(axis=1)
+    scores = adjacent.astype(np.float64) @ weights
+    return overlaps, scores
+
+
+if NUMBA_AVAILABLE:
+    @njit(_SCORE_CANDIDATE_SIG, **_JIT_OPTIONS)
+    def _score_candidate(candidates, i, placed, weights):
+        """Overlap flag and adjacency score of candidate i against the placed rooms"""
+        cx, cy, cw, ch = candidates[i, 0], candidates[i, 1], candidates[i, 2], candidates[i, 3]
+        overlap = False
+        score = 0.0
+        for j in range(placed.shape[0]):
+            px, py, pw, ph = placed[j, 0], placed[j, 1], placed[j, 2], placed[j, 3]
+            x_overlap = not (cx + cw <= px or px + pw <= cx)
+            y_overlap = not (cy + ch <= py or py + ph <= cy)
+            overlap = overlap or (x_overlap and y_overlap)
+
+            # Same branch order as are_adjacent
+            if cx + cw == px or px + pw == cx:
+                adjacent = y_overlap
+            else:
+                adjacent = (cy + ch == py or py + ph == cy) and x_overlap
+            if adjacent:
+                score += weights[j]
+        return overlap, score
+
+    @njit(_SCORE_CANDIDATES_SIG, **_JIT_OPTIONS)
+    def _score_candidates_nb(candidates, placed, weights):
+        """Numba version of score_candidates, one pass per candidate"""
+        m = candidates.shape[0]
+        overlaps = np.zeros(m, dtype=np.bool_)
+        scores = np.zeros(m, dtype=np.float64)
+        for i in range(m):
+            overlaps[i], scores[i] = _score_candidate(candidates, i, placed, weights)
+        return overlaps, scores
+
+    @njit(parallel=True, **_JIT_OPTIONS)
+    def _score_candidates_par(candidates, placed, weights):
+        """Parallel version of _score_candidates_nb, candidates split across threads"""
+        m = candidates.shape[0]
+        overlaps = np.zeros(m, dtype=np.bool_)
+        scores = np.zeros(m, dtype=np.float64)
+        for i in prange(m):
+            overlaps[i], scores[i] = _score_candidate(candidates, i, placed, weights)
+        return overlaps, scores
+
+
+def score_candidates(candidates, placed, weights, parallel=False):
+    """
+    Score candidate positions for one room against the placed rooms.
+
+    Args:
+        candidates: (m, 4) float64 array of candidate (x, y, width, height)
+        placed: (p, 4) float64 array of placed room (x, y, width, height)
+        weights: (p,) float64 array with the adjacency weight of each
+            placed room for the room being placed
+        parallel: Whether to split the candidates across threads
+
+    Returns:
+        Tuple (overlaps, scores) of (m,) arrays: whether each candidate
+        overlaps a placed room, and the summed weights of the placed rooms
+        it is adjacent to
+    """
+    if NUMBA_AVAILABLE:
+        candidates, placed = _as_rects(candidates), _as_rects(placed)
+        weights = _as_rects(weights)
+        if parallel:
+            with _PARALLEL_LOCK:
+                return _score_candidates_par(candidates, placed, weights)
+        return _score_candidates_nb(candidates, placed, weights)
+    return _score_candidates_np(candidates, placed, weights)
+
+
+def _fit_np(x, y, w, h, x1, y1, x2, y2):
+    """Broadcast the region fit score of rects (x, y, w, h) in regions (x1, y1, x2, y2)"""
+    contains = (x >= x1) & (x + w <= x2) & (y >= y1) & (y + h <= y2)
+
+    # Free space on each side, summed in the same order as the scalar version
+    total_space = (x - x1) + (x2 - (x + w)) + (y - y1) + (y2 - (y + h))
+    area = w * h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fit = area / (area + total_space)
+    return np.where(contains, fit, 0.0)
+
+
+def _region_fit_scores_np(rects, regions):
+    """NumPy version of region_fit_scores, broadcasting rects against regions"""
+    return _fit_np(*(rects[:, i:i + 1] for i in range(4)), *(regions[:, i] for i in range(4)))
+
+
+if NUMBA_AVAILABLE:
+    @njit(_FIT_ONE_SIG, **_JIT_OPTIONS)
+    def _fit_one(rects, i, regions, j):
+        """Fit of rect i in region j"""
+        x, y, w, h = rects[i, 0], rects[i, 1], rects[i, 2], rects[i, 3]
+        x1, y1, x2, y2 = regions[j, 0], regions[j, 1], regions[j, 2], regions[j, 3]
+        # Bitwise tests and a select rather than branches, as in _fit_np
+        contains = (x >= x1) & (x + w <= x2) & (y >= y1) & (y + h <= y2)
+        total_space = (x - x1) + (x2 - (x + w)) + (y - y1) + (y2 - (y + h))
+        area = w * h
+        fit = area / (area + total_space)
+        return fit if contains else 0.0
+
+    @njit(_FIT_RECT_SIG, **_JIT_OPTIONS)
+    def _fit_rect(rects, i, regions, fits):
+        """Fill row i of fits with the fit of rect i in each region"""
+        for j in range(regions.shape[0]):
+            fits[i, j] = _fit_one(rects, i, regions, j)
+
+    @njit(_REGION_FIT_SCORES_SIG, **_JIT_OPTIONS)
+    def _region_fit_scores_nb(rects, regions):
+        """Numba version of region_fit_scores, one pass per rect and region"""
+        fits = np.zeros((rects.shape[0], regions.shape[0]), dtype=np.float64)
+        for i in range(rects.shape[0]):
+            _fit_rect(rects, i, regions, fits)
+        return fits
+
+    @njit(parallel=True, **_JIT_OPTIONS)
+    def _region_fit_scores_par(rects, regions):
+        """Parallel version of _region_fit_scores_nb, rects split across threads"""
+        fits = np.zeros((rects.shape[0], regions.shape[0]), dtype=np.float64)
+        for i in prange(rects.shape[0]):
+            _fit_rect(rects, i, regions, fits)
+        return fits
+
+
+def region_fit_scores(rects, regions, parallel=False):
+    """
+    Score how well each rectangle fits in each region.
+
+    Args:
+        rects: (m, 4) float64 array of room (x, y, width, height)
+        regions: (k, 4) float64 array of region (x1, y1, x2, y2)
+        parallel: Whether to split the rects across threads
+
+    Returns:
+        (m, k) float64 array with the room area over the room area plus the
+        free space around it, or 0 where the room is not inside the region
+    """
+    if NUMBA_AVAILABLE:
+        rects, regions = _as_rects(rects), _as_rects(regions)
+        if parallel:
+            with _PARALLEL_LOCK:
+                return _region_fit_scores_par(rects, regions)
+        return _region_fit_scores_nb(rects, regions)
+    return _region_fit_scores_np(rects, regions)
+
+
+def _score_placements_np(candidates, bounds, placed, weights):
+    """NumPy version of score_placements"""
+    overlaps, scores = _score_candidates_np(candidates, placed, weights)
+    fits = _fit_np(*(candidates[:, i] for i in range(4)), *(bounds[:, i] for i in range(4)))
+    return overlaps, scores, fits
+
+
+if NUMBA_AVAILABLE:
+    @njit(_SCORE_PLACEMENTS_SIG, **_JIT_OPTIONS)
+    def _score_placements_nb(candidates, bounds, placed, weights):
+        """Numba version of score_placements, one pass per candidate"""
+        m = candidates.shape[0]
+        overlaps = np.zeros(m, dtype=np.bool_)
+        scores = np.zeros(m, dtype=np.float64)
+        fits = np.zeros(m, dtype=np.float64)
+        for i in range(m):
+            overlaps[i], scores[i] = _score_candidate(candidates, i, placed, weights)
+            fits[i] = _fit_one(candidates, i, bounds, i)
+        return overlaps, scores, fits
+
+    @njit(parallel=True, **_JIT_OPTIONS)
+    def _score_placements_par(candidates, bounds, placed, weights):
+        """Parallel version of _score_placements_nb, candidates split across threads"""
+        m = candidates.shape[0]
+        overlaps = np.zeros(m, dtype=np.bool_)
+        scores = np.zeros(m, dtype=np.float64)
+        fits = np.zeros(m, dtype=np.float64)
+        for i in prange(m):
+            overlaps[i], scores[i] = _score_candidate(candidates, i, placed, weights)
+            fits[i] = _fit_one(candidates, i, bounds, i)
+        return overlaps, scores, fits
+
+
+def score_placements(candidates, bounds, placed, weights, parallel=False):
+    """
+    Score candidate placements, each in its own region, in one pass.
+
+    Combines score_candidates with the region fit of every candidate, so
+    each candidate is read once for the overlap, adjacency and fit tests.
+
+    Args:
+        candidates: (m, 4) float64 array of candidate (x, y, width, height)
+        bounds: (m, 4) float64 array with the (x1, y1, x2, y2) of the
+            region of each candidate
+        placed: (p, 4) float64 array of placed room (x, y, width, height)
+        weights: (p,) float64 array with the adjacency weight of each
+            placed room for the room being placed
+        parallel: Whether to split the candidates across threads
+
+    Returns:
+        Tuple (overlaps, scores, fits) of (m,) arrays: the score_candidates
+        results and the fit of each candidate in its region
+    """
+    if NUMBA_AVAILABLE:
+        candidates, bounds = _as_rects(candidates), _as_rects(bounds)
+        placed, weights = _as_rects(placed), _as_rects(weights)
+        if parallel:
+            with _PARALLEL_LOCK:
+                return _score_placements_par(candidates, bounds, placed, weights)
+        return _score_placements_nb(candidates, bounds, placed, weights)
+    return _score_placements_np(candidates, bounds, placed, weights)
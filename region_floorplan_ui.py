@@ -5,19 +5,127 @@ matplotlib.use('Qt5Agg')
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import (Qt, QThread, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex,
+                          QObject, QRunnable, QThreadPool)
+from PyQt5.QtGui import QBrush
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QSpinBox, QSlider, QPushButton, 
                              QCheckBox, QTabWidget, QGridLayout, QGroupBox, 
                              QRadioButton, QProgressBar, QMessageBox, QDoubleSpinBox,
-                             QComboBox, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QComboBox, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+                             QStyledItemDelegate,
                              QLineEdit, QScrollArea, QSizePolicy)
 import time
 import random
+from collections import OrderedDict
+from contextlib import contextmanager
 
 # Import the region-based strategy
 from strategy import (Room, PlotRegion, RegionBasedPlacement, 
-                     create_h_shape_regions, are_adjacent)
+                     create_h_shape_regions, are_adjacent, rects_to_polygons)
+from placement_kernel import NUMBA_AVAILABLE
+
+# Quiet period after the last edit before a table announces its change
+CHANGE_DEBOUNCE_MS = 30
+
+class BulkUpdateMixin:
+    """Mixin for tables that mutate many cells in one go"""
+    
+    _bulk = 0
+    _dirty = True
+    _debounce = None
+    
+    def _invalidate(self):
+        """Mark the cached table contents as stale"""
+        self._dirty = True
+        
+    def _cache_valid(self, cache):
+        """Whether a cached per-row list can be patched instead of re-read"""
+        return not self._dirty and not self._bulk and cache is not None
+        
+    def _emit_later(self, signal):
+        """
+        Emit a change signal once edits pause for CHANGE_DEBOUNCE_MS, so a
+        burst of edits (e.g. holding a spin box arrow) triggers one update.
+        """
+        if self._debounce is None:
+            self._debounce = QTimer(self)
+            self._debounce.setSingleShot(True)
+            self._debounce.setInterval(CHANGE_DEBOUNCE_MS)
+            self._debounce.timeout.connect(signal.emit)
+        self._debounce.start()
+        
+    def _set_int_item(self, row, col, value):
+        """Store an integer in a cell, reusing its item when there is one"""
+        item = self.item(row, col)
+        if item is None:
+            item = QTableWidgetItem()
+            item.setData(Qt.EditRole, value)
+            self.setItem(row, col, item)
+        else:
+            item.setData(Qt.EditRole, value)
+            
+    def _int_value(self, row, col, default):
+        """Read an integer cell, falling back to default if it is empty"""
+        item = self.item(row, col)
+        value = item.data(Qt.EditRole) if item else None
+        return default if value is None else int(value)
+    
+    @contextmanager
+    def _bulk_update(self, signal=None):
+        """
+        Suspend repaints and signals while many cells change.
+        
+        Args:
+            signal: Change signal to emit once when the outermost bulk
+                update finishes (None to stay silent)
+        """
+        if self._bulk == 0:
+            self._bulk_signals = []
+            self.setUpdatesEnabled(False)
+            self.viewport().setUpdatesEnabled(False)
+            self.blockSignals(True)
+        if signal is not None and signal not in self._bulk_signals:
+            self._bulk_signals.append(signal)
+        self._bulk += 1
+        try:
+            yield
+        finally:
+            self._bulk -= 1
+            if self._bulk == 0:
+                self._dirty = True
+                self.blockSignals(False)
+                self.viewport().setUpdatesEnabled(True)
+                self.setUpdatesEnabled(True)
+        
+        # Emit one aggregate change notification
+        if self._bulk == 0:
+            for pending in self._bulk_signals:
+                pending.emit()
+            self._bulk_signals = []
+
+class IntSpinDelegate(QStyledItemDelegate):
+    """Edits integer cells with a spin box created only while editing"""
+    
+    def __init__(self, minimum, maximum, parent=None):
+        super().__init__(parent)
+        self.minimum = minimum
+        self.maximum = maximum
+        
+    def createEditor(self, parent, option, index):
+        editor = QSpinBox(parent)
+        editor.setRange(self.minimum, self.maximum)
+        # Commit every step so the preview follows the spin box live
+        editor.valueChanged.connect(lambda: self.commitData.emit(editor))
+        return editor
+        
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(Qt.EditRole)))
+        
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        if index.data(Qt.EditRole) != editor.value():
+            model.setData(index, editor.value(), Qt.EditRole)
 
 class RegionViewer(FigureCanvas):
     """Widget to display the regions and room placements"""
@@ -28,21 +136,171 @@ class RegionViewer(FigureCanvas):
         self.setParent(parent)
         self.strategy = None
         
-    def update_view(self, strategy=None, title=None):
-        """Update the visualization with the given strategy"""
+        # Blitting state: cached background and placement-dependent artists
+        self._bg = None
+        self._artists = None
+        self._view_key = None
+        self.mpl_connect('draw_event', self._on_draw)
+        
+        # Latest (title, render_data, preview) requested while hidden
+        self._pending = None
+        
+    def showEvent(self, event):
+        """Draw the view that was requested while the canvas was hidden"""
+        super().showEvent(event)
+        if self._pending is not None:
+            title, render_data, preview = self._pending
+            self._pending = None
+            self.update_view(title=title, render_data=render_data, preview=preview)
+        
+    def _on_draw(self, event):
+        """Cache the static background after a full draw"""
+        self._bg = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+        
+    def _animated_artists(self):
+        """Return the artists that change between placements"""
+        if not self._artists:
+            return []
+        return ([self._artists['rooms']] + self._artists['labels'] +
+                self._artists['edges'] + [self._artists['stats']])
+        
+    def _draw_animated(self):
+        """Draw the animated artists on top of the current canvas"""
+        for artist in self._animated_artists():
+            self.axes.draw_artist(artist)
+            
+    def _get_view_key(self, strategy, title, render_data, preview):
+        """Key identifying everything a full draw depends on"""
+        regions = tuple(region.get_rect() for region in strategy.regions)
+        return (regions, len(render_data['ids']), title, preview)
+        
+    def update_view(self, strategy=None, title=None, render_data=None, preview=False):
+        """
+        Update the visualization with the given strategy.
+        
+        Args:
+            strategy: Placement strategy to show (keeps the current one if None)
+            title: Title for the plot
+            render_data: Geometry from strategy.get_render_data(), ideally
+                built off the GUI thread (computed here if None)
+            preview: Draw only the region outline, without the adjacency
+                lines and legend, for previews before any placement
+        """
         if strategy:
             self.strategy = strategy
             
+        if not self.isVisible():
+            # Nothing can be seen yet, so defer the draw until shown
+            self._pending = (title, render_data, preview)
+            return
+            
         if self.strategy:
+            if render_data is None:
+                render_data = self.strategy.get_render_data()
+                
+            # Same regions and room count: only re-blit the rooms
+            view_key = self._get_view_key(self.strategy, title, render_data, preview)
+            if view_key == self._view_key and self._bg is not None:
+                self.update_rooms(render_data)
+                return
+                
             self.axes.clear()
-            self.strategy.visualize(show_adjacency=True, title=title, axes=self.axes)
-            self.draw()
+            self._artists = self.strategy.visualize(show_adjacency=not preview, title=title,
+                                                    axes=self.axes, render_data=render_data,
+                                                    show_legend=not preview)
+            for artist in self._animated_artists():
+                artist.set_animated(True)
+            self._view_key = view_key
+            self.draw_idle()
         else:
             self.axes.clear()
+            self._artists = None
+            self._view_key = None
             self.axes.set_title("No data to display")
             self.axes.text(0.5, 0.5, "Configure regions and rooms to generate a floorplan", 
                          ha='center', va='center')
-            self.draw()
+            self.draw_idle()
+            
+    def update_rooms(self, render_data):
+        """
+        Move the existing room artists to the given render data and
+        re-blit them over the cached background.
+        """
+        self._artists['rooms'].set_verts(rects_to_polygons(render_data['rects']))
+        for room_id, center, label in zip(
+                render_data['ids'], render_data['centers'], self._artists['labels']):
+            label.set_position(center)
+            label.set_text(f"{room_id}")
+            
+        if self._artists['edges']:
+            satisfied_line, unsatisfied_line = self._artists['edges']
+            satisfied_line.set_data(*render_data['satisfied'])
+            unsatisfied_line.set_data(*render_data['unsatisfied'])
+        self._artists['stats'].set_text(render_data['stats'])
+        
+        self.restore_region(self._bg)
+        self._draw_animated()
+        self.blit(self.fig.bbox)
+
+# Payloads of the most recent deterministic placements, keyed by _strategy_key
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_SIZE = 16
+
+def _rooms_key(rooms):
+    """Hashable key of a list of room definitions"""
+    return tuple((room.id, room.width, room.height, room.name) for room in rooms)
+
+def _regions_key(regions):
+    """Hashable key of a list of region definitions"""
+    return tuple((region.x1, region.y1, region.x2, region.y2, region.name) for region in regions)
+
+def _adjacency_key(adjacency):
+    """Hashable key of an adjacency dict"""
+    return tuple(sorted((room_id, tuple(neighbors)) for room_id, neighbors in adjacency.items()))
+
+def _strategy_key(strategy):
+    """Hashable key of everything a placement result depends on"""
+    params = (strategy.sort_method, strategy.optimize_rotations, strategy.step_size,
+              strategy.adjacency_weight, strategy.area_weight, strategy.timeout,
+              strategy.use_first_fit_decreasing)
+    return (_rooms_key(strategy.rooms), _regions_key(strategy.regions),
+            _adjacency_key(strategy.adjacency), params)
+
+class PreviewSink(QObject):
+    """Carries preview results from pool workers back to the GUI thread"""
+    done = pyqtSignal(int, object, object)
+    failed = pyqtSignal(int, str)
+
+class PreviewRunnable(QRunnable):
+    """
+    Build or refresh the preview strategy and its render data on a pooled
+    worker thread. Inputs that are None are left as they are.
+    """
+    def __init__(self, generation, sink, strategy=None, rooms=None, regions=None, adjacency=None):
+        super().__init__()
+        self.generation = generation
+        self.sink = sink
+        self.strategy = strategy
+        self.rooms = rooms
+        self.regions = regions
+        self.adjacency = adjacency
+        
+    def run(self):
+        try:
+            strategy = self.strategy
+            if strategy is None:
+                strategy = RegionBasedPlacement(self.rooms, self.regions, self.adjacency)
+            else:
+                if self.rooms is not None:
+                    strategy.update_rooms(self.rooms)
+                if self.regions is not None:
+                    strategy.update_regions(self.regions)
+                if self.adjacency is not None:
+                    strategy.update_adjacency(self.adjacency)
+            self.sink.done.emit(self.generation, strategy, strategy.get_render_data())
+        except Exception as e:
+            self.sink.failed.emit(self.generation, str(e))
 
 class StrategyThread(QThread):
     """Thread for running the placement strategy"""
@@ -52,12 +310,25 @@ class StrategyThread(QThread):
     def __init__(self, strategy, parent=None):
         super().__init__(parent)
         self.strategy = strategy
+        # Taken before placement, which rotates the rooms in place
+        self.key = _strategy_key(strategy)
+        # Backtracking stops when its wall-clock timeout runs out, so a rerun
+        # may find a different placement; only the other modes are reused
+        self.cacheable = strategy.use_first_fit_decreasing or strategy.timeout <= 0
         
     def run(self):
         try:
             start_time = time.time()
             self.progress_signal.emit(10, "Starting room placement...")
             
+            # Identical inputs give the same placement, so reuse it
+            if self.cacheable and self.key in _RESULT_CACHE:
+                _RESULT_CACHE.move_to_end(self.key)
+                payload = _RESULT_CACHE[self.key]
+                self.progress_signal.emit(90, f"Placed {len(payload['strategy'].placed_rooms)} rooms (cached)")
+                self.finished_signal.emit(payload)
+                return
+            
             # Run the placement algorithm
             self.strategy.clear_placements()
             self.strategy.place_rooms()
@@ -66,14 +337,24 @@ class StrategyThread(QThread):
             elapsed_time = time.time() - start_time
             adjacency_score = self.strategy.get_adjacency_score()
             
+            # Build the plot geometry here so the GUI thread only updates artists
+            payload = self.strategy.get_render_data()
+            payload['strategy'] = self.strategy
+            payload['adjacency_score'] = adjacency_score
+            
+            if self.cacheable:
+                _RESULT_CACHE[self.key] = payload
+                if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+                    _RESULT_CACHE.popitem(last=False)
+            
             self.progress_signal.emit(90, f"Placed {len(self.strategy.placed_rooms)} rooms in {elapsed_time:.2f}s")
-            self.finished_signal.emit(self.strategy)
+            self.finished_signal.emit(payload)
             
         except Exception as e:
             print(f"Error in strategy thread: {str(e)}")
             self.progress_signal.emit(100, f"Error: {str(e)}")
 
-class RoomDefinitionTable(QTableWidget):
+class RoomDefinitionTable(BulkUpdateMixin, QTableWidget):
     """Custom table widget for defining rooms"""
     
     roomChanged = pyqtSignal()
@@ -86,6 +367,12 @@ class RoomDefinitionTable(QTableWidget):
         self.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
         self.verticalHeader().setVisible(True)
+        self._rooms_cache = None
+        
+        # Width and height are edited through on-demand spin boxes
+        self.size_delegate = IntSpinDelegate(1, 20, self)
+        self.setItemDelegateForColumn(1, self.size_delegate)
+        self.setItemDelegateForColumn(2, self.size_delegate)
         
         # Initial setup with default 5 rooms
         self.setRowCount(5)
@@ -104,85 +391,82 @@ class RoomDefinitionTable(QTableWidget):
             ("Bathroom", 2, 2)
         ]
         
-        for row, (name, width, height) in enumerate(default_rooms):
-            # Room name
-            name_item = QTableWidgetItem(name)
-            self.setItem(row, 0, name_item)
-            
-            # Width
-            width_spinner = QSpinBox()
-            width_spinner.setRange(1, 20)
-            width_spinner.setValue(width)
-            width_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 1, width_spinner)
-            
-            # Height
-            height_spinner = QSpinBox()
-            height_spinner.setRange(1, 20)
-            height_spinner.setValue(height)
-            height_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 2, height_spinner)
-    
-    def on_cell_changed(self):
+        with self._bulk_update():
+            for row, (name, width, height) in enumerate(default_rooms):
+                # Room name
+                name_item = QTableWidgetItem(name)
+                self.setItem(row, 0, name_item)
+                
+                # Width and height
+                self._set_int_item(row, 1, width)
+                self._set_int_item(row, 2, height)
+    
+    def on_cell_changed(self, row, col):
         """Handle cell content changes"""
-        self.roomChanged.emit()
+        # A single edit only re-reads its own row
+        if self._cache_valid(self._rooms_cache) and row < len(self._rooms_cache):
+            self._rooms_cache[row] = self._read_room(row)
+        else:
+            self._invalidate()
+        if self._bulk:
+            return
+        self._emit_later(self.roomChanged)
     
     def add_room(self):
         """Add a new room to the table"""
         row_count = self.rowCount()
-        self.setRowCount(row_count + 1)
         
-        # Default values for the new room
-        self.setItem(row_count, 0, QTableWidgetItem(f"Room {row_count + 1}"))
-        
-        # Width spinner
-        width_spinner = QSpinBox()
-        width_spinner.setRange(1, 20)
-        width_spinner.setValue(2)
-        width_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 1, width_spinner)
-        
-        # Height spinner
-        height_spinner = QSpinBox()
-        height_spinner.setRange(1, 20)
-        height_spinner.setValue(2)
-        height_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 2, height_spinner)
-        
-        self.roomChanged.emit()
+        # Announced as a single change once the row is filled in
+        with self._bulk_update(self.roomChanged):
+            self.setRowCount(row_count + 1)
+            
+            # Default values for the new room
+            self.setItem(row_count, 0, QTableWidgetItem(f"Room {row_count + 1}"))
+            
+            # Width and height
+            self._set_int_item(row_count, 1, 2)
+            self._set_int_item(row_count, 2, 2)
     
     def remove_room(self):
         """Remove the last room from the table"""
         row_count = self.rowCount()
         if row_count > 1:
             self.setRowCount(row_count - 1)
+            if self._cache_valid(self._rooms_cache):
+                del self._rooms_cache[row_count - 1:]
+            else:
+                self._invalidate()
             self.roomChanged.emit()
     
     def get_rooms(self):
-        """Get the room definitions as a list of Room objects"""
-        rooms = []
-        for row in range(self.rowCount()):
-            try:
-                # Get room name with fallback
-                name = self.item(row, 0).text() if self.item(row, 0) else f"Room {row+1}"
-                
-                # Get width and height with error checking
-                width_widget = self.cellWidget(row, 1)
-                height_widget = self.cellWidget(row, 2)
-                
-                width = width_widget.value() if width_widget else 2
-                height = height_widget.value() if height_widget else 2
-                
-                room = Room(row + 1, width, height, name)
-                rooms.append(room)
-            except Exception as e:
-                print(f"Error creating room at row {row}: {str(e)}")
-                # Add a default room as fallback
-                room = Room(row + 1, 2, 2, f"Room {row+1}")
-                rooms.append(room)
-        return rooms
+        """
+        Get the room definitions as a list of Room objects.
+        
+        The table is only re-read after it changed; fresh Room objects are
+        built from the cached values every time since placement mutates them.
+        """
+        if self._dirty or self._rooms_cache is None:
+            self._rooms_cache = [self._read_room(row) for row in range(self.rowCount())]
+            self._dirty = False
+        return [Room(*spec) for spec in self._rooms_cache]
+    
+    def _read_room(self, row):
+        """Read one room definition from the table items as (id, width, height, name)"""
+        try:
+            # Get room name with fallback
+            name = self.item(row, 0).text() if self.item(row, 0) else f"Room {row+1}"
+            
+            # Get width and height with error checking
+            width = self._int_value(row, 1, 2)
+            height = self._int_value(row, 2, 2)
+            
+            return (row + 1, width, height, name)
+        except Exception as e:
+            print(f"Error creating room at row {row}: {str(e)}")
+            # Use a default room as fallback
+            return (row + 1, 2, 2, f"Room {row+1}")
 
-class RegionDefinitionTable(QTableWidget):
+class RegionDefinitionTable(BulkUpdateMixin, QTableWidget):
     """Custom table widget for defining regions"""
     
     regionChanged = pyqtSignal()
@@ -196,6 +480,13 @@ class RegionDefinitionTable(QTableWidget):
             self.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeToContents)
         self.verticalHeader().setVisible(True)
         
+        self._regions_cache = None
+        
+        # Coordinates are edited through on-demand spin boxes
+        self.coordinate_delegate = IntSpinDelegate(0, 50, self)
+        for col in range(1, 5):
+            self.setItemDelegateForColumn(col, self.coordinate_delegate)
+        
         # Initial setup with default H-shape regions
         self.setRowCount(3)
         self.setup_default_regions()
@@ -216,182 +507,250 @@ class RegionDefinitionTable(QTableWidget):
             name_item = QTableWidgetItem(name)
             self.setItem(row, 0, name_item)
             
-            # X1
-            x1_spinner = QSpinBox()
-            x1_spinner.setRange(0, 50)
-            x1_spinner.setValue(x1)
-            x1_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 1, x1_spinner)
-            
-            # Y1
-            y1_spinner = QSpinBox()
-            y1_spinner.setRange(0, 50)
-            y1_spinner.setValue(y1)
-            y1_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 2, y1_spinner)
-            
-            # X2
-            x2_spinner = QSpinBox()
-            x2_spinner.setRange(0, 50)
-            x2_spinner.setValue(x2)
-            x2_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 3, x2_spinner)
-            
-            # Y2
-            y2_spinner = QSpinBox()
-            y2_spinner.setRange(0, 50)
-            y2_spinner.setValue(y2)
-            y2_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 4, y2_spinner)
-    
-    def on_cell_changed(self):
+            # X1, Y1, X2, Y2
+            for col, value in enumerate((x1, y1, x2, y2), start=1):
+                self._set_int_item(row, col, value)
+    
+    def on_cell_changed(self, row, col):
         """Handle cell content changes"""
-        # Ensure x1 < x2 and y1 < y2
-        for row in range(self.rowCount()):
-            # Get cell widgets with safety checks
-            x1_widget = self.cellWidget(row, 1)
-            y1_widget = self.cellWidget(row, 2)
-            x2_widget = self.cellWidget(row, 3)
-            y2_widget = self.cellWidget(row, 4)
+        # A bulk update emits a single change once it finishes
+        patch = self._cache_valid(self._regions_cache) and row < len(self._regions_cache)
+        self._invalidate()
+        if self._bulk:
+            return
             
-            # Skip if any widgets are missing
-            if not all([x1_widget, y1_widget, x2_widget, y2_widget]):
-                continue
-                
-            # Get values safely
-            x1 = x1_widget.value()
-            y1 = y1_widget.value()
-            x2 = x2_widget.value()
-            y2 = y2_widget.value()
+        # Ensure x1 < x2 and y1 < y2, only for the row that changed
+        if col > 0 and all(self.item(row, c) for c in range(1, 5)):
+            x1 = self._int_value(row, 1, 0)
+            y1 = self._int_value(row, 2, 0)
+            x2 = self._int_value(row, 3, 5)
+            y2 = self._int_value(row, 4, 5)
             
-            if x2 <= x1:
-                x2_widget.setValue(x1 + 1)
-            if y2 <= y1:
-                y2_widget.setValue(y1 + 1)
+            with self._bulk_update():
+                if x2 <= x1:
+                    self._set_int_item(row, 3, x1 + 1)
+                if y2 <= y1:
+                    self._set_int_item(row, 4, y1 + 1)
         
-        self.regionChanged.emit()
+        # A single edit only re-reads its own row
+        if patch:
+            self._regions_cache[row] = self._read_region(row)
+            self._dirty = False
+        self._emit_later(self.regionChanged)
     
     def add_region(self):
         """Add a new region to the table"""
         row_count = self.rowCount()
-        self.setRowCount(row_count + 1)
-        
-        # Default values for the new region
-        self.setItem(row_count, 0, QTableWidgetItem(f"Region {row_count + 1}"))
-        
-        # X1
-        x1_spinner = QSpinBox()
-        x1_spinner.setRange(0, 50)
-        x1_spinner.setValue(0)
-        x1_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 1, x1_spinner)
-        
-        # Y1
-        y1_spinner = QSpinBox()
-        y1_spinner.setRange(0, 50)
-        y1_spinner.setValue(0)
-        y1_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 2, y1_spinner)
-        
-        # X2
-        x2_spinner = QSpinBox()
-        x2_spinner.setRange(0, 50)
-        x2_spinner.setValue(5)
-        x2_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 3, x2_spinner)
-        
-        # Y2
-        y2_spinner = QSpinBox()
-        y2_spinner.setRange(0, 50)
-        y2_spinner.setValue(5)
-        y2_spinner.valueChanged.connect(self.on_cell_changed)
-        self.setCellWidget(row_count, 4, y2_spinner)
-        
-        self.regionChanged.emit()
+        
+        # Announced as a single change once the row is filled in
+        with self._bulk_update(self.regionChanged):
+            self.setRowCount(row_count + 1)
+            
+            # Default values for the new region
+            self.setItem(row_count, 0, QTableWidgetItem(f"Region {row_count + 1}"))
+            
+            # X1, Y1, X2, Y2
+            for col, value in enumerate((0, 0, 5, 5), start=1):
+                self._set_int_item(row_count, col, value)
     
     def remove_region(self):
         """Remove the last region from the table"""
         row_count = self.rowCount()
         if row_count > 1:
             self.setRowCount(row_count - 1)
+            if self._cache_valid(self._regions_cache):
+                del self._regions_cache[row_count - 1:]
+            else:
+                self._invalidate()
             self.regionChanged.emit()
     
     def get_regions(self):
-        """Get the region definitions as a list of PlotRegion objects"""
-        regions = []
-        for row in range(self.rowCount()):
-            try:
-                # Get region name with fallback
-                name = self.item(row, 0).text() if self.item(row, 0) else f"Region {row+1}"
-                
-                # Get coordinates with error checking
-                x1_widget = self.cellWidget(row, 1)
-                y1_widget = self.cellWidget(row, 2)
-                x2_widget = self.cellWidget(row, 3)
-                y2_widget = self.cellWidget(row, 4)
-                
-                x1 = x1_widget.value() if x1_widget else 0
-                y1 = y1_widget.value() if y1_widget else 0
-                x2 = x2_widget.value() if x2_widget else 5
-                y2 = y2_widget.value() if y2_widget else 5
+        """
+        Get the region definitions as a list of PlotRegion objects.
+        
+        The table is only re-read after it changed; the regions themselves
+        are shared between calls and must be treated as read-only.
+        """
+        if self._dirty or self._regions_cache is None:
+            self._regions_cache = [self._read_region(row) for row in range(self.rowCount())]
+            self._dirty = False
+        return list(self._regions_cache)
+    
+    def _read_region(self, row):
+        """Read one region definition from the table items"""
+        try:
+            # Get region name with fallback
+            name = self.item(row, 0).text() if self.item(row, 0) else f"Region {row+1}"
+            
+            # Get coordinates with error checking
+            x1 = self._int_value(row, 1, 0)
+            y1 = self._int_value(row, 2, 0)
+            x2 = self._int_value(row, 3, 5)
+            y2 = self._int_value(row, 4, 5)
+            
+            # Ensure x2 > x1 and y2 > y1
+            if x2 <= x1:
+                x2 = x1 + 1
+            if y2 <= y1:
+                y2 = y1 + 1
                 
-                # Ensure x2 > x1 and y2 > y1
-                if x2 <= x1:
-                    x2 = x1 + 1
-                if y2 <= y1:
-                    y2 = y1 + 1
-                    
-                region = PlotRegion(x1, y1, x2, y2, name)
-                regions.append(region)
-            except Exception as e:
-                print(f"Error creating region at row {row}: {str(e)}")
-                # Add a default region as fallback
-                region = PlotRegion(0, 0, 5, 5, f"Region {row+1}")
-                regions.append(region)
-        return regions
+            return PlotRegion(x1, y1, x2, y2, name)
+        except Exception as e:
+            print(f"Error creating region at row {row}: {str(e)}")
+            # Use a default region as fallback
+            return PlotRegion(0, 0, 5, 5, f"Region {row+1}")
+    
+    def _update_region_row(self, row, region):
+        """Write a region's name and bounds into an existing table row"""
+        name_item = self.item(row, 0)
+        if name_item:
+            name_item.setText(region.name)
+        else:
+            self.setItem(row, 0, QTableWidgetItem(region.name))
+            
+        bounds = (region.x1, region.y1, region.x2, region.y2)
+        for col, value in enumerate(bounds, start=1):
+            self._set_int_item(row, col, int(value))
     
     def apply_h_shape(self, width, height, corridor_width):
         """Apply H-shape regions with the given dimensions"""
         regions = create_h_shape_regions(width, height, corridor_width)
         
+        # Re-applying the current shape changes nothing, so skip the rewrite
+        # and the preview it would trigger
+        def rows(regions):
+            return [(region.name, int(region.x1), int(region.y1), int(region.x2), int(region.y2))
+                    for region in regions]
+        if rows(regions) == rows(self.get_regions()):
+            return
+        
         # Update the table with the new regions
-        self.setRowCount(len(regions))
-        for row, region in enumerate(regions):
-            # Region name
-            name_item = QTableWidgetItem(region.name)
-            self.setItem(row, 0, name_item)
-            
-            # X1
-            x1_spinner = QSpinBox()
-            x1_spinner.setRange(0, 50)
-            x1_spinner.setValue(int(region.x1))
-            x1_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 1, x1_spinner)
+        with self._bulk_update(self.regionChanged):
+            existing_rows = self.rowCount()
+            self.setRowCount(len(regions))
+            for row, region in enumerate(regions):
+                if row < existing_rows:
+                    # Reuse the existing row, only updating its values
+                    self._update_region_row(row, region)
+                    continue
+                
+                # Region name
+                name_item = QTableWidgetItem(region.name)
+                self.setItem(row, 0, name_item)
+                
+                # X1, Y1, X2, Y2
+                for col, value in enumerate((int(region.x1), int(region.y1), int(region.x2), int(region.y2)), start=1):
+                    self._set_int_item(row, col, value)
+
+# Shared by every paint of the disabled diagonal cells
+_DIAGONAL_BRUSH = QBrush(Qt.lightGray)
+
+def _pair_index(row, col, n):
+    """
+    Index of the unordered room pair (row, col) in a packed upper triangle.
+    
+    Works element-wise on arrays; row and col must differ.
+    """
+    row, col = np.minimum(row, col), np.maximum(row, col)
+    return row * (2 * n - row - 1) // 2 + (col - row - 1)
+
+class AdjacencyModel(QAbstractTableModel):
+    """
+    Table model for a symmetric adjacency relation.
+    
+    Each room pair is stored once as a bit of a packed upper triangle, and
+    both (row, col) and (col, row) cells are rendered from that bit.
+    """
+    
+    def __init__(self, room_count=5, parent=None):
+        super().__init__(parent)
+        self.room_count = room_count
+        self.bits = np.zeros(room_count * (room_count - 1) // 2, dtype=bool)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.room_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.room_count
+    
+    def flags(self, index):
+        if index.row() == index.column():
+            # No self-connections
+            return Qt.NoItemFlags
+        return Qt.ItemIsUserCheckable | Qt.ItemIsEnabled
+    
+    def data(self, index, role=Qt.DisplayRole):
+        row, col = index.row(), index.column()
+        if row == col:
+            return _DIAGONAL_BRUSH if role == Qt.BackgroundRole else None
+        if role == Qt.CheckStateRole:
+            checked = self.bits[_pair_index(row, col, self.room_count)]
+            return Qt.Checked if checked else Qt.Unchecked
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        row, col = index.row(), index.column()
+        if role != Qt.CheckStateRole or row == col:
+            return False
             
-            # Y1
-            y1_spinner = QSpinBox()
-            y1_spinner.setRange(0, 50)
-            y1_spinner.setValue(int(region.y1))
-            y1_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 2, y1_spinner)
+        k = _pair_index(row, col, self.room_count)
+        checked = value == Qt.Checked
+        if self.bits[k] != checked:
+            self.bits[k] = checked
             
-            # X2
-            x2_spinner = QSpinBox()
-            x2_spinner.setRange(0, 50)
-            x2_spinner.setValue(int(region.x2))
-            x2_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 3, x2_spinner)
+            # One notification covering both cells that show this bit
+            low, high = min(row, col), max(row, col)
+            self.dataChanged.emit(self.index(low, low), self.index(high, high),
+                                  [Qt.CheckStateRole])
+        return True
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        # Headers are the 1-indexed room numbers
+        if role == Qt.DisplayRole:
+            return str(section + 1)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+    
+    def set_bits(self, bits):
+        """
+        Replace every connection at once, notifying views with a single
+        dataChanged over the range of cells that actually changed.
+        """
+        changed = np.nonzero(bits != self.bits)[0]
+        self.bits = bits
+        if len(changed) == 0:
+            return
             
-            # Y2
-            y2_spinner = QSpinBox()
-            y2_spinner.setRange(0, 50)
-            y2_spinner.setValue(int(region.y2))
-            y2_spinner.valueChanged.connect(self.on_cell_changed)
-            self.setCellWidget(row, 4, y2_spinner)
-        
-        self.regionChanged.emit()
+        # Pairs are stored with row < col, so both mirrored cells of every
+        # changed pair lie within [low, high] on each axis
+        rows, cols = np.triu_indices(self.room_count, 1)
+        low, high = int(rows[changed].min()), int(cols[changed].max())
+        self.dataChanged.emit(self.index(low, low), self.index(high, high),
+                              [Qt.CheckStateRole])
+    
+    def to_array(self):
+        """Return the relation as a symmetric (n, n) uint8 matrix"""
+        n = self.room_count
+        rows, cols = np.triu_indices(n, 1)
+        matrix = np.zeros((n, n), dtype=np.uint8)
+        matrix[rows[self.bits], cols[self.bits]] = 1
+        matrix |= matrix.T
+        return matrix
+    
+    def resize(self, room_count):
+        """Change the room count, keeping the connections between remaining rooms"""
+        keep = min(self.room_count, room_count)
+        rows, cols = np.triu_indices(keep, 1)
+        bits = np.zeros(room_count * (room_count - 1) // 2, dtype=bool)
+        bits[_pair_index(rows, cols, room_count)] = self.bits[_pair_index(rows, cols, self.room_count)]
+        
+        self.beginResetModel()
+        self.room_count = room_count
+        self.bits = bits
+        self.endResetModel()
 
-class AdjacencyMatrix(QTableWidget):
+class AdjacencyMatrix(BulkUpdateMixin, QTableView):
     """Widget for editing the adjacency matrix"""
     
     adjacencyChanged = pyqtSignal()
@@ -399,207 +758,92 @@ class AdjacencyMatrix(QTableWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.MinimumExpanding)
-        self.setSelectionMode(QTableWidget.SingleSelection)
-        self.room_count = 5  # Default
-        self.setup_matrix()
-        
-    def setup_matrix(self):
-        """Set up the adjacency matrix with the current room count"""
-        self.setRowCount(self.room_count)
-        self.setColumnCount(self.room_count)
-        
-        # Set headers (room numbers)
-        headers = [str(i + 1) for i in range(self.room_count)]
-        self.setHorizontalHeaderLabels(headers)
-        self.setVerticalHeaderLabels(headers)
-        
-        # Center align headers
-        for i in range(self.room_count):
-            self.horizontalHeaderItem(i).setTextAlignment(Qt.AlignCenter)
-            self.verticalHeaderItem(i).setTextAlignment(Qt.AlignCenter)
-        
-        # Resize columns and rows to contents
+        self.setSelectionMode(QTableView.SingleSelection)
+        self._adjacency_cache = None
+        
+        # Default 5 rooms
+        self.adjacency_model = AdjacencyModel(5, self)
+        self.setModel(self.adjacency_model)
+        self.resize_to_contents()
+        
+        # Symmetry is inherent to the model, so only forward the change
+        self.adjacency_model.dataChanged.connect(self.on_checkbox_changed)
+    
+    @property
+    def room_count(self):
+        return self.adjacency_model.room_count
+    
+    def resize_to_contents(self):
+        """Resize columns and rows to contents"""
         self.resizeColumnsToContents()
         self.resizeRowsToContents()
-        
-        # Fill with checkboxes
-        for row in range(self.room_count):
-            for col in range(self.room_count):
-                if row == col:
-                    # No self-connections
-                    item = QTableWidgetItem()
-                    item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
-                    item.setBackground(Qt.lightGray)
-                    self.setItem(row, col, item)
-                else:
-                    # Create checkbox
-                    checkbox = QCheckBox()
-                    checkbox.setChecked(False)
-                    
-                    # For diagonal symmetry, check if opposite already exists
-                    if col < row and self.cellWidget(col, row) is not None:
-                        opposite_checkbox = self.cellWidget(col, row).findChild(QCheckBox)
-                        if opposite_checkbox:
-                            checkbox.setChecked(opposite_checkbox.isChecked())
-                    
-                    # Center checkbox in cell
-                    cell_widget = QWidget()
-                    layout = QHBoxLayout(cell_widget)
-                    layout.addWidget(checkbox)
-                    layout.setAlignment(Qt.AlignCenter)
-                    layout.setContentsMargins(0, 0, 0, 0)
-                    cell_widget.setLayout(layout)
-                    
-                    # Connect to maintain symmetry
-                    checkbox.stateChanged.connect(self.on_checkbox_changed)
-                    
-                    self.setCellWidget(row, col, cell_widget)
     
     def on_checkbox_changed(self):
-        """Handle checkbox state changes and ensure matrix symmetry"""
-        # Find which checkbox was changed
-        changed_checkbox = self.sender()
-        if not changed_checkbox:
-            return
-            
-        # Find its position in the table
-        for row in range(self.rowCount()):
-            for col in range(self.columnCount()):
-                cell_widget = self.cellWidget(row, col)
-                if cell_widget:
-                    checkbox = cell_widget.findChild(QCheckBox)
-                    if checkbox is changed_checkbox:
-                        # Update the symmetric position
-                        opposite_widget = self.cellWidget(col, row)
-                        if opposite_widget:
-                            opposite_checkbox = opposite_widget.findChild(QCheckBox)
-                            if opposite_checkbox:
-                                # Block signals to prevent recursion
-                                opposite_checkbox.blockSignals(True)
-                                opposite_checkbox.setChecked(checkbox.isChecked())
-                                opposite_checkbox.blockSignals(False)
-                        
-                        # Emit signal for change
-                        self.adjacencyChanged.emit()
-                        return
+        """Handle check state changes"""
+        self._invalidate()
+        self._emit_later(self.adjacencyChanged)
     
     def update_size(self, room_count):
         """Update the matrix size for the given room count"""
         if room_count == self.room_count:
             return
             
-        # Store existing connections
-        connections = {}
-        for row in range(min(self.room_count, room_count)):
-            for col in range(min(self.room_count, room_count)):
-                if row != col:
-                    cell_widget = self.cellWidget(row, col)
-                    if cell_widget:
-                        checkbox = cell_widget.findChild(QCheckBox)
-                        if checkbox:
-                            connections[(row, col)] = checkbox.isChecked()
-        
-        # Update room count and recreate matrix
-        self.room_count = room_count
-        self.setup_matrix()
-        
-        # Restore connections
-        for (row, col), is_connected in connections.items():
-            cell_widget = self.cellWidget(row, col)
-            if cell_widget:
-                checkbox = cell_widget.findChild(QCheckBox)
-                if checkbox:
-                    checkbox.setChecked(is_connected)
+        self.adjacency_model.resize(room_count)
+        self._invalidate()
+        self.resize_to_contents()
     
     def get_adjacency_dict(self):
         """
         Get the adjacency requirements as a dictionary.
         Returns a dict mapping room ids to lists of adjacent room ids.
+        The dict is cached until the matrix changes and must not be mutated.
         """
-        adjacency_dict = {}
-        
-        for row in range(self.room_count):
-            try:
-                room_id = row + 1  # 1-indexed
-                adjacency_dict[room_id] = []
-                
-                for col in range(self.room_count):
-                    if row != col:
-                        cell_widget = self.cellWidget(row, col)
-                        if cell_widget:
-                            checkbox = cell_widget.findChild(QCheckBox)
-                            if checkbox and checkbox.isChecked():
-                                adjacency_dict[room_id].append(col + 1)  # 1-indexed
-            except Exception as e:
-                print(f"Error processing adjacency at row {row}: {str(e)}")
-                # Initialize empty adjacency list as fallback
-                adjacency_dict[row + 1] = []
-        
-        return adjacency_dict
+        if self._dirty or self._adjacency_cache is None:
+            # Room ids are 1-indexed
+            self._adjacency_cache = {row + 1: (np.flatnonzero(neighbors) + 1).tolist()
+                                     for row, neighbors in enumerate(self.get_adjacency_array())}
+            self._dirty = False
+        return self._adjacency_cache
+    
+    def get_adjacency_array(self):
+        """
+        Get the adjacency requirements as a symmetric (n, n) uint8 matrix,
+        where entry [i, j] is 1 if rooms i + 1 and j + 1 must be adjacent.
+        """
+        return self.adjacency_model.to_array()
     
     def fill_with_pattern(self, pattern):
         """Fill the adjacency matrix with a predefined pattern"""
-        # Clear all connections first
-        for row in range(self.room_count):
-            for col in range(self.room_count):
-                if row != col:
-                    cell_widget = self.cellWidget(row, col)
-                    if cell_widget:
-                        checkbox = cell_widget.findChild(QCheckBox)
-                        if checkbox:
-                            checkbox.setChecked(False)
+        n = self.room_count
+        index = np.arange(n)
+        
+        # Start from no connections; each pair is written once
+        bits = np.zeros(n * (n - 1) // 2, dtype=bool)
         
         if pattern == "Linear":
-            # Each room connects to next/previous room (chain)
-            for i in range(self.room_count - 1):
-                cell_widget1 = self.cellWidget(i, i + 1)
-                cell_widget2 = self.cellWidget(i + 1, i)
-                if cell_widget1 and cell_widget2:
-                    checkbox1 = cell_widget1.findChild(QCheckBox)
-                    checkbox2 = cell_widget2.findChild(QCheckBox)
-                    if checkbox1 and checkbox2:
-                        checkbox1.setChecked(True)
-                        checkbox2.setChecked(True)
-                        
+            # Each room connects to next room (chain)
+            bits[_pair_index(index[:-1], index[1:], n)] = True
+            
         elif pattern == "Hub":
             # First room connects to all others (star)
-            for i in range(1, self.room_count):
-                cell_widget1 = self.cellWidget(0, i)
-                cell_widget2 = self.cellWidget(i, 0)
-                if cell_widget1 and cell_widget2:
-                    checkbox1 = cell_widget1.findChild(QCheckBox)
-                    checkbox2 = cell_widget2.findChild(QCheckBox)
-                    if checkbox1 and checkbox2:
-                        checkbox1.setChecked(True)
-                        checkbox2.setChecked(True)
-                        
+            bits[_pair_index(0, index[1:], n)] = True
+            
         elif pattern == "Grid":
             # Grid pattern (if enough rooms)
-            side_length = int(np.sqrt(self.room_count))
-            for i in range(self.room_count):
-                # Connect to right neighbor
-                if (i + 1) % side_length != 0 and i + 1 < self.room_count:
-                    cell_widget1 = self.cellWidget(i, i + 1)
-                    cell_widget2 = self.cellWidget(i + 1, i)
-                    if cell_widget1 and cell_widget2:
-                        checkbox1 = cell_widget1.findChild(QCheckBox)
-                        checkbox2 = cell_widget2.findChild(QCheckBox)
-                        if checkbox1 and checkbox2:
-                            checkbox1.setChecked(True)
-                            checkbox2.setChecked(True)
-                
-                # Connect to bottom neighbor
-                if i + side_length < self.room_count:
-                    cell_widget1 = self.cellWidget(i, i + side_length)
-                    cell_widget2 = self.cellWidget(i + side_length, i)
-                    if cell_widget1 and cell_widget2:
-                        checkbox1 = cell_widget1.findChild(QCheckBox)
-                        checkbox2 = cell_widget2.findChild(QCheckBox)
-                        if checkbox1 and checkbox2:
-                            checkbox1.setChecked(True)
-                            checkbox2.setChecked(True)
-        
-        self.adjacencyChanged.emit()
+            side_length = int(np.sqrt(n))
+            
+            # Connect to right neighbor
+            right = (index + 1 < n) & ((index + 1) % side_length != 0)
+            bits[_pair_index(index[right], index[right] + 1, n)] = True
+            
+            # Connect to bottom neighbor
+            below = index + side_length < n
+            bits[_pair_index(index[below], index[below] + side_length, n)] = True
+            
+        self.adjacency_model.set_bits(bits)
+
+# Quiet period after the last input change before the preview is redrawn
+PREVIEW_DEBOUNCE_MS = 200
 
 class RegionFloorplanApp(QMainWindow):
     """Main application window for region-based floorplan generation"""
@@ -623,6 +867,29 @@ class RegionFloorplanApp(QMainWindow):
         # Initialize the generator thread
         self.strategy_thread = None
         
+        # Bursts of edits are collapsed into one preview
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self._preview_timer.timeout.connect(self.update_preview)
+        
+        # Preview strategy reused between previews; only the inputs that
+        # changed since the last preview are re-read
+        self._preview_strategy = None
+        self._preview_keys = None
+        self._rooms_dirty = True
+        self._regions_dirty = True
+        self._adjacency_dirty = True
+        
+        # Previews are built on the global thread pool, one at a time; a
+        # result is shown only if nothing newer was requested meanwhile
+        self._preview_sink = PreviewSink(self)
+        self._preview_sink.done.connect(self.on_preview_done)
+        self._preview_sink.failed.connect(self.on_preview_failed)
+        self._preview_generation = 0
+        self._preview_running = False
+        self._preview_pending = False
+        
         # Initialization flag
         self.initializing = True
         
@@ -738,17 +1005,70 @@ class RegionFloorplanApp(QMainWindow):
         # Algorithm type
         params_layout.addWidget(QLabel("Algorithm:"), 6, 0)
         self.algorithm_combo = QComboBox()
-        self.algorithm_combo.addItems(["Backtracking + Greedy", "Greedy Only"])
-        self.algorithm_combo.setToolTip("Backtracking tries harder to satisfy all constraints but may be slower")
+        self.algorithm_combo.addItems(["Backtracking + Greedy", "Greedy Only", "First Fit Decreasing"])
+        self.algorithm_combo.setToolTip("Backtracking tries harder to satisfy all constraints but may be slower; "
+                                        "First Fit Decreasing packs the largest rooms first")
         params_layout.addWidget(self.algorithm_combo, 6, 1)
         
+        # Parallel candidate scoring
+        params_layout.addWidget(QLabel("Parallel Search:"), 7, 0)
+        self.parallel_checkbox = QCheckBox()
+        self.parallel_checkbox.setChecked(False)
+        self.parallel_checkbox.setEnabled(NUMBA_AVAILABLE)
+        self.parallel_checkbox.setToolTip("Score candidate positions on all CPU cores (requires numba)")
+        params_layout.addWidget(self.parallel_checkbox, 7, 1)
+        
         # Connect signals for weights to ensure they sum to <= 1.0
         self.adjacency_weight_spin.valueChanged.connect(self.update_area_weight_max)
         self.area_weight_spin.valueChanged.connect(self.update_adjacency_weight_max)
         
+        # Parameters are read from the widgets again only after one changed
+        self._params_cache = None
+        self.sort_method_combo.currentTextChanged.connect(self._invalidate_params)
+        self.rotation_checkbox.toggled.connect(self._invalidate_params)
+        self.step_size_spin.valueChanged.connect(self._invalidate_params)
+        self.adjacency_weight_spin.valueChanged.connect(self._invalidate_params)
+        self.area_weight_spin.valueChanged.connect(self._invalidate_params)
+        self.timeout_spin.valueChanged.connect(self._invalidate_params)
+        self.algorithm_combo.currentTextChanged.connect(self._invalidate_params)
+        self.parallel_checkbox.toggled.connect(self._invalidate_params)
+        
         params_group.setLayout(params_layout)
         self.control_layout.addWidget(params_group)
     
+    def _invalidate_params(self):
+        """Drop the cached algorithm parameters after a widget changed"""
+        self._params_cache = None
+    
+    def _collect_params(self):
+        """Read the algorithm parameters from their widgets"""
+        sort_method = self.sort_method_combo.currentText().lower()
+        if sort_method == "degree-area":
+            sort_method = "degree_area"  # Match the internal name
+            
+        algorithm = self.algorithm_combo.currentText()
+        timeout = self.timeout_spin.value()
+        if algorithm == "Greedy Only":
+            # Disable backtracking by setting timeout to 0
+            timeout = 0
+            
+        return {
+            "sort_method": sort_method,
+            "optimize_rotations": self.rotation_checkbox.isChecked(),
+            "step_size": self.step_size_spin.value(),
+            "adjacency_weight": self.adjacency_weight_spin.value(),
+            "area_weight": self.area_weight_spin.value(),
+            "timeout": timeout,
+            "parallel_search": self.parallel_checkbox.isChecked(),
+            "first_fit_decreasing": algorithm == "First Fit Decreasing",
+        }
+    
+    def get_params(self):
+        """Get the algorithm parameters, re-reading the widgets only after a change"""
+        if self._params_cache is None:
+            self._params_cache = self._collect_params()
+        return self._params_cache
+    
     def update_area_weight_max(self, value):
         """Update the maximum allowed area weight based on adjacency weight"""
         max_area = min(0.9, 1.0 - value)
@@ -845,9 +1165,17 @@ class RegionFloorplanApp(QMainWindow):
     
     def create_adjacency_group(self):
         """Create the adjacency matrix group"""
-        adjacency_group = QGroupBox("Adjacency Requirements")
+        # Collapsed by default; the matrix is only built once it is expanded
+        self.adjacency_group = QGroupBox("Adjacency Requirements")
+        self.adjacency_group.setCheckable(True)
+        self.adjacency_group.setChecked(False)
+        self.adjacency_group.toggled.connect(self.on_adjacency_group_toggled)
         adjacency_layout = QVBoxLayout()
         
+        self.adjacency_content = QWidget()
+        content_layout = QVBoxLayout(self.adjacency_content)
+        content_layout.setContentsMargins(0, 0, 0, 0)
+        
         # Pattern buttons
         pattern_layout = QHBoxLayout()
         pattern_layout.addWidget(QLabel("Pattern:"))
@@ -862,21 +1190,46 @@ class RegionFloorplanApp(QMainWindow):
         apply_pattern_button.clicked.connect(self.apply_adjacency_pattern)
         pattern_layout.addWidget(apply_pattern_button)
         
-        adjacency_layout.addLayout(pattern_layout)
+        content_layout.addLayout(pattern_layout)
         
         # Create scrollable area for adjacency matrix
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
+        self.adjacency_scroll = QScrollArea()
+        self.adjacency_scroll.setWidgetResizable(True)
+        content_layout.addWidget(self.adjacency_scroll)
         
-        # Adjacency matrix
-        self.adjacency_matrix = AdjacencyMatrix()
-        self.adjacency_matrix.adjacencyChanged.connect(self.on_adjacency_changed)
-        scroll_area.setWidget(self.adjacency_matrix)
+        # Adjacency matrix, see _ensure_adjacency_matrix
+        self.adjacency_matrix = None
         
-        adjacency_layout.addWidget(scroll_area)
+        adjacency_layout.addWidget(self.adjacency_content)
+        self.on_adjacency_group_toggled(False)
         
-        adjacency_group.setLayout(adjacency_layout)
-        self.control_layout.addWidget(adjacency_group)
+        self.adjacency_group.setLayout(adjacency_layout)
+        self.control_layout.addWidget(self.adjacency_group)
+    
+    def _ensure_adjacency_matrix(self):
+        """Build the adjacency matrix on first use and return it"""
+        if self.adjacency_matrix is None:
+            self.adjacency_matrix = AdjacencyMatrix()
+            self.adjacency_matrix.update_size(self.room_table.rowCount())
+            self.adjacency_matrix.adjacencyChanged.connect(self.on_adjacency_changed)
+            self.adjacency_scroll.setWidget(self.adjacency_matrix)
+        return self.adjacency_matrix
+    
+    def on_adjacency_group_toggled(self, expanded):
+        """Show or hide the adjacency editor, building it when first expanded"""
+        if expanded:
+            self._ensure_adjacency_matrix()
+        self.adjacency_content.setVisible(expanded)
+        
+        # Don't take up space with just the title while collapsed
+        vertical_policy = QSizePolicy.Preferred if expanded else QSizePolicy.Maximum
+        self.adjacency_group.setSizePolicy(QSizePolicy.Preferred, vertical_policy)
+    
+    def get_adjacency_dict(self):
+        """Adjacency requirements from the matrix (none until it is built)"""
+        if self.adjacency_matrix is None:
+            return {}
+        return self.adjacency_matrix.get_adjacency_dict()
     
     def create_visualization_panel(self):
         """Create the visualization panel"""
@@ -895,23 +1248,30 @@ class RegionFloorplanApp(QMainWindow):
         """Handle room definition changes"""
         # Update adjacency matrix size
         room_count = self.room_table.rowCount()
-        self.adjacency_matrix.update_size(room_count)
+        if self.adjacency_matrix is not None:
+            self.adjacency_matrix.update_size(room_count)
+        self._rooms_dirty = True
+        self._adjacency_dirty = True
         
         # Update the visualization if not initializing
         if not self.initializing:
-            self.update_preview()
+            self._preview_timer.start()
     
     def on_region_changed(self):
         """Handle region definition changes"""
+        self._regions_dirty = True
+        
         # Update the visualization if not initializing
         if not self.initializing:
-            self.update_preview()
+            self._preview_timer.start()
     
     def on_adjacency_changed(self):
         """Handle adjacency matrix changes"""
+        self._adjacency_dirty = True
+        
         # Update the visualization if not initializing
         if not self.initializing:
-            self.update_preview()
+            self._preview_timer.start()
     
     def apply_h_shape(self):
         """Apply H-shape regions with current dimensions"""
@@ -926,24 +1286,79 @@ class RegionFloorplanApp(QMainWindow):
         """Apply the selected adjacency pattern"""
         pattern = self.pattern_combo.currentText()
         if pattern != "None":
-            self.adjacency_matrix.fill_with_pattern(pattern)
+            self._ensure_adjacency_matrix().fill_with_pattern(pattern)
     
     def update_preview(self):
         """Update the visualization preview"""
+        # The running worker owns the preview strategy; go again once it is done
+        if self._preview_running:
+            self._preview_pending = True
+            return
+            
         try:
-            # Get current data
-            rooms = self.room_table.get_rooms()
-            regions = self.region_table.get_regions()
-            adjacency_dict = self.adjacency_matrix.get_adjacency_dict()
+            # Read only the inputs that changed since the last preview; the
+            # worker creates the strategy or refreshes the reused one
+            strategy = self._preview_strategy
+            full = strategy is None
+            rooms = self.room_table.get_rooms() if full or self._rooms_dirty else None
+            regions = self.region_table.get_regions() if full or self._regions_dirty else None
+            adjacency = self.get_adjacency_dict() if full or self._adjacency_dirty else None
+            self._rooms_dirty = self._regions_dirty = self._adjacency_dirty = False
             
-            # Create a strategy object for preview
-            strategy = RegionBasedPlacement(rooms, regions, adjacency_dict)
+            # Keys of the inputs the preview strategy holds, patched with the re-read ones
+            keys = list(self._preview_keys or (None, None, None))
+            for index, (value, key) in enumerate(((rooms, _rooms_key), (regions, _regions_key),
+                                                   (adjacency, _adjacency_key))):
+                if value is not None:
+                    keys[index] = key(value)
+            keys = tuple(keys)
+        except Exception as e:
+            self.on_preview_failed(self._preview_generation, str(e))
+            return
             
+        # Nothing to lay out yet; read everything again once there is
+        if not keys[0] or not keys[1]:
+            self._preview_strategy = self._preview_keys = None
+            self.status_label.setText("Preview: define at least one room and one region")
+            return
+            
+        # The edits left the inputs as they were, so the shown preview still holds
+        if not full and keys == self._preview_keys:
+            return
+            
+        self._preview_keys = keys
+        self._preview_generation += 1
+        self._preview_running = True
+        QThreadPool.globalInstance().start(PreviewRunnable(
+            self._preview_generation, self._preview_sink, strategy, rooms, regions, adjacency))
+    
+    def _finish_preview(self, generation):
+        """
+        Mark the running preview as finished. Returns whether its result is
+        still the latest one, starting the next preview if one was requested.
+        """
+        self._preview_running = False
+        if self._preview_pending:
+            self._preview_pending = False
+            self.update_preview()
+            return False
+        return generation == self._preview_generation
+    
+    def on_preview_done(self, generation, strategy, render_data):
+        """Show a preview built by a pool worker"""
+        self._preview_strategy = strategy
+        if self._finish_preview(generation):
             # Update the viewer without running the placement
-            self.region_viewer.update_view(strategy, "Region Preview (No Placement)")
-        except Exception as e:
-            print(f"Error updating preview: {str(e)}")
-            self.status_label.setText(f"Error updating preview: {str(e)}")
+            self.region_viewer.update_view(strategy, "Region Preview (No Placement)",
+                                           render_data=render_data, preview=True)
+    
+    def on_preview_failed(self, generation, message):
+        """Report an error from building the preview"""
+        # The reused strategy may be half refreshed, so start over next time
+        self._preview_strategy = self._preview_keys = None
+        if self._finish_preview(generation):
+            print(f"Error updating preview: {message}")
+            self.status_label.setText(f"Error updating preview: {message}")
     
     def create_preset_button_group(self):
         """Create preset buttons for quick configuration"""
@@ -972,8 +1387,39 @@ class RegionFloorplanApp(QMainWindow):
         preset_group.setLayout(preset_layout)
         return preset_group
     
+    @contextmanager
+    def _batch_updates(self):
+        """
+        Block the parameter widgets' signals while a preset is written.
+        
+        The weight spinboxes cap each other, so both are opened up to 1.0
+        first; otherwise a weight could be clamped by the previous preset's
+        cap before its partner is updated. The caps are recomputed once at
+        the end.
+        """
+        widgets = [self.sort_method_combo, self.rotation_checkbox, self.step_size_spin,
+                   self.adjacency_weight_spin, self.area_weight_spin, self.timeout_spin,
+                   self.algorithm_combo, self.parallel_checkbox]
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.adjacency_weight_spin.setMaximum(1.0)
+        self.area_weight_spin.setMaximum(1.0)
+        try:
+            yield
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
+            self.update_area_weight_max(self.adjacency_weight_spin.value())
+            self.update_adjacency_weight_max(self.area_weight_spin.value())
+            self._invalidate_params()
+    
     def apply_preset(self, preset_name):
         """Apply predefined parameter presets"""
+        with self._batch_updates():
+            self._write_preset(preset_name)
+    
+    def _write_preset(self, preset_name):
+        """Write the values of a preset into the parameter widgets"""
         if preset_name == "simple":
             # Simple preset - basic parameters
             self.sort_method_combo.setCurrentText("Area")
@@ -983,6 +1429,7 @@ class RegionFloorplanApp(QMainWindow):
             self.area_weight_spin.setValue(0.5)
             self.timeout_spin.setValue(15)
             self.algorithm_combo.setCurrentText("Greedy Only")
+            self.parallel_checkbox.setChecked(False)
             
         elif preset_name == "optimal":
             # Optimal preset - best quality but slower
@@ -993,6 +1440,7 @@ class RegionFloorplanApp(QMainWindow):
             self.area_weight_spin.setValue(0.3)
             self.timeout_spin.setValue(60)
             self.algorithm_combo.setCurrentText("Backtracking + Greedy")
+            self.parallel_checkbox.setChecked(False)
             
         elif preset_name == "adjacency":
             # Adjacency preset - focus on connections
@@ -1003,6 +1451,7 @@ class RegionFloorplanApp(QMainWindow):
             self.area_weight_spin.setValue(0.1)
             self.timeout_spin.setValue(45)
             self.algorithm_combo.setCurrentText("Backtracking + Greedy")
+            self.parallel_checkbox.setChecked(False)
             
         elif preset_name == "speed":
             # Speed preset - faster results
@@ -1013,14 +1462,19 @@ class RegionFloorplanApp(QMainWindow):
             self.area_weight_spin.setValue(0.4)
             self.timeout_spin.setValue(10)
             self.algorithm_combo.setCurrentText("Greedy Only")
+            self.parallel_checkbox.setChecked(NUMBA_AVAILABLE)
     
     def generate_floorplan(self):
         """Generate floorplan using the region-based strategy"""
+        # The generated result supersedes any pending or running preview
+        self._preview_timer.stop()
+        self._preview_pending = False
+        self._preview_generation += 1
         try:
             # Get current data
             rooms = self.room_table.get_rooms()
             regions = self.region_table.get_regions()
-            adjacency_dict = self.adjacency_matrix.get_adjacency_dict()
+            adjacency_dict = self.get_adjacency_dict()
             
             # Validate input data
             if not rooms:
@@ -1035,21 +1489,15 @@ class RegionFloorplanApp(QMainWindow):
             strategy = RegionBasedPlacement(rooms, regions, adjacency_dict)
             
             # Set algorithm parameters
-            sort_method = self.sort_method_combo.currentText().lower()
-            if sort_method == "degree-area":
-                sort_method = "degree_area"  # Match the internal name
-            
-            strategy.set_sort_method(sort_method)
-            strategy.optimize_rotations = self.rotation_checkbox.isChecked()
-            strategy.step_size = self.step_size_spin.value()
-            strategy.adjacency_weight = self.adjacency_weight_spin.value()
-            strategy.area_weight = self.area_weight_spin.value()
-            strategy.timeout = self.timeout_spin.value()
-            
-            # Set algorithm type
-            if self.algorithm_combo.currentText() == "Greedy Only":
-                # Disable backtracking by setting timeout to 0
-                strategy.timeout = 0
+            params = self.get_params()
+            strategy.set_sort_method(params["sort_method"])
+            strategy.optimize_rotations = params["optimize_rotations"]
+            strategy.step_size = params["step_size"]
+            strategy.adjacency_weight = params["adjacency_weight"]
+            strategy.area_weight = params["area_weight"]
+            strategy.timeout = params["timeout"]
+            strategy.parallel_search = params["parallel_search"]
+            strategy.use_first_fit_decreasing = params["first_fit_decreasing"]
             
             # Disable the generate button during generation
             self.generate_button.setEnabled(False)
@@ -1071,20 +1519,22 @@ class RegionFloorplanApp(QMainWindow):
         self.progress_bar.setValue(progress)
         self.status_label.setText(status)
     
-    def show_results(self, strategy):
+    def show_results(self, payload):
         """Show the generated floorplan results"""
         # Re-enable the generate button
         self.generate_button.setEnabled(True)
+        strategy = payload['strategy']
         
         # Get adjacency score
-        satisfied, total, ratio = strategy.get_adjacency_score()
+        satisfied, total, ratio = payload['adjacency_score']
         self.status_label.setText(
             f"Placed {len(strategy.placed_rooms)}/{len(strategy.rooms)} rooms. "
             f"Adjacency: {satisfied}/{total} ({ratio:.2f})"
         )
         
         # Update the visualization
-        self.region_viewer.update_view(strategy, f"Region-Based Placement (Sort: {strategy.sort_method})")
+        self.region_viewer.update_view(strategy, f"Region-Based Placement (Sort: {strategy.sort_method})",
+                                       render_data=payload)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,11 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import os
 import time
 import random
 import math
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
 import heapq
+import itertools
+
+from placement_kernel import (first_overlaps, pairwise_adjacent, region_fit_scores, score_candidates,
+                              score_placements)
 
 class Room:
     def __init__(self, room_id, width, height, name=None):
@@ -55,6 +59,14 @@ class Room:
     
     def distance_to(self, other):
         """Calculate the center-to-center distance between rooms"""
+        return math.sqrt(self.sq_distance_to(other))
+    
+    def sq_distance_to(self, other):
+        """
+        Squared center-to-center distance between rooms. It orders rooms the
+        same way as distance_to without the square root, so use it for
+        comparisons and keep distance_to for display.
+        """
         if self.x is None or other.x is None:
             return float('inf')
             
@@ -63,80 +75,72 @@ class Room:
         
         dx = my_center[0] - other_center[0]
         dy = my_center[1] - other_center[1]
-        return math.sqrt(dx**2 + dy**2)
+        return dx * dx + dy * dy
     
     def get_adjacent_positions(self, other):
         """
         Get potential positions for this room that would be adjacent to the other room.
         Returns a list of (x, y, is_rotated) tuples.
         """
-        positions = []
-        
-        # Try original orientation
-        # Left side
-        positions.append((other.x - self.width, other.y, False))
-        # Right side
-        positions.append((other.x + other.width, other.y, False))
-        # Top side
-        positions.append((other.x, other.y - self.height, False))
-        # Bottom side
-        positions.append((other.x, other.y + other.height, False))
-        
-        # Try various offsets along each side to maximize adjacency
-        # Left side offsets
-        for offset in range(1, min(self.height, other.height)):
-            positions.append((other.x - self.width, other.y + offset, False))
-            positions.append((other.x - self.width, other.y - offset, False))
-        
-        # Right side offsets
-        for offset in range(1, min(self.height, other.height)):
-            positions.append((other.x + other.width, other.y + offset, False))
-            positions.append((other.x + other.width, other.y - offset, False))
-            
-        # Top side offsets
-        for offset in range(1, min(self.width, other.width)):
-            positions.append((other.x + offset, other.y - self.height, False))
-            positions.append((other.x - offset, other.y - self.height, False))
-            
-        # Bottom side offsets
-        for offset in range(1, min(self.width, other.width)):
-            positions.append((other.x + offset, other.y + other.height, False))
-            positions.append((other.x - offset, other.y + other.height, False))
-        
-        # If rotation is allowed, add rotated positions
-        rotated_room = Room(self.id, self.height, self.width, self.name)
-        
-        # Left side (rotated)
-        positions.append((other.x - rotated_room.width, other.y, True))
-        # Right side (rotated)
-        positions.append((other.x + other.width, other.y, True))
-        # Top side (rotated)
-        positions.append((other.x, other.y - rotated_room.height, True))
-        # Bottom side (rotated)
-        positions.append((other.x, other.y + other.height, True))
-        
-        # Add offsets for rotated positions
-        # Left side offsets (rotated)
-        for offset in range(1, min(rotated_room.height, other.height)):
-            positions.append((other.x - rotated_room.width, other.y + offset, True))
-            positions.append((other.x - rotated_room.width, other.y - offset, True))
-        
-        # Right side offsets (rotated)
-        for offset in range(1, min(rotated_room.height, other.height)):
-            positions.append((other.x + other.width, other.y + offset, True))
-            positions.append((other.x + other.width, other.y - offset, True))
-            
-        # Top side offsets (rotated)
-        for offset in range(1, min(rotated_room.width, other.width)):
-            positions.append((other.x + offset, other.y - rotated_room.height, True))
-            positions.append((other.x - offset, other.y - rotated_room.height, True))
-            
-        # Bottom side offsets (rotated)
-        for offset in range(1, min(rotated_room.width, other.width)):
-            positions.append((other.x + offset, other.y + other.height, True))
-            positions.append((other.x - offset, other.y + other.height, True))
-        
-        return positions
+        # Positions in the original orientation, then the rotated one, each
+        # on the four sides and then at offsets along each side
+        return [(other.x + dx, other.y + dy, is_rotated) for dx, dy, is_rotated in
+                _adjacent_offset_list(self.width, self.height, other.width, other.height)]
+
+@lru_cache(maxsize=1024)
+def _adjacent_offset_list(width, height, other_width, other_height):
+    """
+    Offsets from an anchor's corner of the positions adjacent to it for a
+    width x height room, as a tuple of (dx, dy, is_rotated) tuples.
+    
+    The loops run once per combination of room and anchor size, which
+    recur throughout a layout. Adding an offset to the corner gives the
+    same number as subtracting the size from it.
+    """
+    offsets = []
+    for is_rotated, (w, h) in ((False, (width, height)), (True, (height, width))):
+        # Sides
+        block = [(-w, 0), (other_width, 0), (0, -h), (0, other_height)]
+        
+        # Offsets along the left, right, top and bottom sides
+        for offset in range(1, min(h, other_height)):
+            block += [(-w, offset), (-w, -offset)]
+        for offset in range(1, min(h, other_height)):
+            block += [(other_width, offset), (other_width, -offset)]
+        for offset in range(1, min(w, other_width)):
+            block += [(offset, -h), (-offset, -h)]
+        for offset in range(1, min(w, other_width)):
+            block += [(offset, other_height), (-offset, other_height)]
+        offsets += [(dx, dy, is_rotated) for dx, dy in block]
+    return tuple(offsets)
+
+@lru_cache(maxsize=1024)
+def _adjacent_offsets(width, height, other_width, other_height):
+    """_adjacent_offset_list as read-only (dx, dy, rotated) arrays"""
+    offsets = tuple(np.array(column) for column in
+                    zip(*_adjacent_offset_list(width, height, other_width, other_height)))
+    for array in offsets:
+        array.flags.writeable = False
+    return offsets
+
+def adjacent_positions(sizes, anchors):
+    """
+    Positions along the sides of each anchor, in the order that
+    Room.get_adjacent_positions lists them for each anchor in turn.
+    
+    Args:
+        sizes: List with the room (width, height) used for each anchor
+        anchors: List of anchor (x, y, width, height) tuples
+        
+    Returns:
+        Tuple (xs, ys, rotated, anchor_idx) of (k,) arrays
+    """
+    offsets = [_adjacent_offsets(width, height, anchor[2], anchor[3])
+               for (width, height), anchor in zip(sizes, anchors)]
+    counts = [len(dx) for dx, _, _ in offsets]
+    corners = np.repeat(np.array(anchors, dtype=float).reshape(-1, 4)[:, :2], counts, axis=0)
+    dx, dy, rotated = (np.concatenate(parts) for parts in zip(*offsets))
+    return corners[:, 0] + dx, corners[:, 1] + dy, rotated, np.repeat(np.arange(len(anchors)), counts)
 
 class PlotRegion:
     def __init__(self, x1, y1, x2, y2, name=None):
@@ -175,15 +179,51 @@ class PlotRegion:
         Get a list of sample positions within this region for the room.
         Returns a list of (x, y) tuples.
         """
-        positions = []
-        x = self.x1
-        while x <= self.x2 - room.width:
-            y = self.y1
-            while y <= self.y2 - room.height:
-                positions.append((x, y))
-                y += step_size
-            x += step_size
-        return positions
+        xs, ys = self.get_sample_axes(room.width, room.height, step_size)
+        return [(x, y) for x in xs.tolist() for y in ys.tolist()]
+    
+    def get_sample_axes(self, width, height, step_size=1):
+        """
+        Get the x and y coordinates sampled within this region for a width x
+        height room; the sample positions are every (x, y) combination.
+        Returns a tuple (xs, ys) of arrays.
+        """
+        return (_sample_axis(self.x1, self.x2 - width, step_size),
+                _sample_axis(self.y1, self.y2 - height, step_size))
+    
+    def batch_fit_scores(self, width, height, xs, ys, parallel=False):
+        """
+        Fit score of a width x height room at each of the positions (xs, ys):
+        the room area over the room area plus the free space around it in
+        this region, or 0 where the room does not fit.
+        Returns an array with one score per position.
+        """
+        xs = np.asarray(xs, dtype=float)
+        rects = np.column_stack((xs, np.asarray(ys, dtype=float),
+                                 np.full(len(xs), width, dtype=float),
+                                 np.full(len(xs), height, dtype=float)))
+        bounds = np.array([[self.x1, self.y1, self.x2, self.y2]], dtype=float)
+        return region_fit_scores(rects, bounds, parallel=parallel)[:, 0]
+
+def _sample_axis(start, stop, step_size):
+    """
+    Array of start, start + step_size, ... up to stop inclusive. The steps
+    are added one at a time, as a loop would, so fractional starts give the
+    same values as repeated addition.
+    """
+    if stop < start:
+        return np.array([start])[:0]
+    count = int((stop - start) // step_size) + 2
+    values = np.add.accumulate(np.array([start] + [step_size] * (count - 1)))
+    return values[values <= stop]
+
+# Room colors, indexed by placement order: matplotlib's tab10 palette as
+# RGBA rows, spelled out so placement and render data need no matplotlib
+ROOM_COLORS = np.array([
+    [int(color[i:i + 2], 16) / 255 for i in (0, 2, 4)] + [1.0]
+    for color in ("1f77b4", "ff7f0e", "2ca02c", "d62728", "9467bd",
+                  "8c564b", "e377c2", "7f7f7f", "bcbd22", "17becf")
+])
 
 def are_adjacent(rect1, rect2):
     """
@@ -204,6 +244,41 @@ def are_adjacent(rect1, rect2):
     
     return False
 
+def edges_to_polyline(edges):
+    """
+    Flatten line segments into a single NaN-separated polyline.
+    
+    Args:
+        edges: List of ((x1, y1), (x2, y2)) segments
+        
+    Returns:
+        Tuple (xs, ys) of float arrays of length 3 * len(edges), so all the
+        segments can be drawn as one line artist
+    """
+    segments = np.asarray(edges, dtype=float).reshape(-1, 2, 2)
+    xs = np.full((len(segments), 3), np.nan)
+    ys = np.full((len(segments), 3), np.nan)
+    xs[:, :2] = segments[:, :, 0]
+    ys[:, :2] = segments[:, :, 1]
+    return xs.ravel(), ys.ravel()
+
+def rects_to_polygons(rects):
+    """
+    Convert rectangles into polygon vertices.
+    
+    Args:
+        rects: Array-like of (x, y, width, height) rows
+        
+    Returns:
+        Float array of shape (n, 4, 2) with the corners of each rectangle,
+        suitable for a PolyCollection
+    """
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    x, y, width, height = rects.T
+    xs = np.stack([x, x + width, x + width, x], axis=1)
+    ys = np.stack([y, y, y + height, y + height], axis=1)
+    return np.stack([xs, ys], axis=2)
+
 class RegionBasedPlacement:
     """Class to handle room placement using the region-based strategy"""
     
@@ -220,18 +295,49 @@ class RegionBasedPlacement:
         self.regions = regions or []
         self.adjacency = adjacency or {}
         self.placed_rooms = []
+        self._placed_rects = np.empty((0, 4))
+        self._placed_rows = np.empty(0, dtype=np.intp)
+        self._placed_rows_key = None
+        self._bounds_regions = None
+        self._bounds = None
+        self._requirements_key = None
+        self._requirements = None
+        self._weight_matrix = None
         self.sort_method = "hybrid"  # Default to hybrid sorting
         self.optimize_rotations = True
         self.step_size = 1  # For position sampling
         self.adjacency_weight = 0.7  # Weight for adjacency in hybrid sorting
         self.area_weight = 0.3  # Weight for area in hybrid sorting
         self.max_backtrack = 3  # Maximum number of backtracking attempts
+        self.max_nogoods = 10000  # Maximum number of cached dead-end search states
+        self.top_k_candidates = None  # Candidates tried per room when backtracking (None for all)
         self.use_adjacency_driven = True  # Whether to use adjacency-driven placement
+        self.use_first_fit_decreasing = False  # Whether to pack rooms largest first instead
         self.timeout = 30  # Timeout in seconds
+        self.parallel_search = False  # Whether to score candidates on all cores
         
         # Create adjacency graph for faster lookups
         self.adjacency_graph = self._build_adjacency_graph()
         
+        # Backtracking state, reset by place_rooms
+        self._nogoods = OrderedDict()
+        self._timed_out = False
+        
+    def update_rooms(self, rooms):
+        """Replace the rooms, dropping any placement made with the old ones"""
+        self.rooms = rooms or []
+        self.placed_rooms = []
+        
+    def update_regions(self, regions):
+        """Replace the regions, dropping any placement made within the old ones"""
+        self.regions = regions or []
+        self.placed_rooms = []
+        
+    def update_adjacency(self, adjacency):
+        """Replace the adjacency requirements and rebuild the lookup graph"""
+        self.adjacency = adjacency or {}
+        self.adjacency_graph = self._build_adjacency_graph()
+        
     def _build_adjacency_graph(self):
         """Build adjacency graph from adjacency dictionary"""
         graph = defaultdict(list)
@@ -240,6 +346,42 @@ class RegionBasedPlacement:
                 graph[room_id].append(neighbor_id)
         return graph
         
+    def _requirement_arrays(self):
+        """
+        Return the adjacency requirements over room indices as arrays.
+        They are rebuilt only when the rooms list or the requirements change.
+        
+        Returns:
+            Tuple (room_index, required, totals): the index of the first
+            room with each id, a (n, n) uint8 matrix counting how often
+            room j is listed as a neighbor of room i, and the (n,) length
+            of each room's neighbor list
+        """
+        key = (self.rooms, self.adjacency_graph)
+        if self._requirements_key is None or any(
+                a is not b for a, b in zip(key, self._requirements_key)):
+            room_index = {}
+            for idx, room in enumerate(self.rooms):
+                room_index.setdefault(room.id, idx)
+            
+            n = len(self.rooms)
+            required = np.zeros((n, n), dtype=np.uint8)
+            totals = np.zeros(n, dtype=int)
+            for room_id, idx in room_index.items():
+                neighbors = self.adjacency.get(room_id, [])
+                totals[idx] = len(neighbors)
+                for neighbor_id in neighbors:
+                    if neighbor_id in room_index:
+                        required[idx, room_index[neighbor_id]] += 1
+            for idx, room in enumerate(self.rooms):
+                totals[idx] = totals[room_index[room.id]]
+            
+            # Weight of room j in the adjacency score of room i
+            self._weight_matrix = (required > 0) + 0.5 * (required.T > 0)
+            self._requirements = (room_index, required, totals)
+            self._requirements_key = key
+        return self._requirements
+        
     def clear_placements(self):
         """Reset all room placements"""
         for room in self.rooms:
@@ -248,6 +390,8 @@ class RegionBasedPlacement:
             room.region = None
             room.rotated = False
         self.placed_rooms = []
+        self._placed_rects = np.empty((len(self.rooms), 4))
+        self._placed_rows = np.empty(len(self.rooms), dtype=np.intp)
     
     def set_sort_method(self, method="hybrid"):
         """Set the method for sorting rooms before placement"""
@@ -258,26 +402,35 @@ class RegionBasedPlacement:
             
     def sort_rooms(self):
         """Sort rooms according to the current sorting method"""
+        if not self.rooms:
+            return []
+            
+        # Per-room features as columns, so each method is one array expression;
+        # stable argsort/lexsort keep sorted()'s tie order
+        features = np.array([(r.width, r.height, r.area(), len(self.adjacency.get(r.id, [])))
+                             for r in self.rooms], dtype=float)
+        width, height, area, degree = features.T
+        
         if self.sort_method == "area":
-            return sorted(self.rooms, key=lambda r: -r.area())
+            order = np.argsort(-area, kind='stable')
         elif self.sort_method == "adjacency":
-            return sorted(self.rooms, key=lambda r: -len(self.adjacency.get(r.id, [])))
+            order = np.argsort(-degree, kind='stable')
         elif self.sort_method == "width":
-            return sorted(self.rooms, key=lambda r: -r.width)
+            order = np.argsort(-width, kind='stable')
         elif self.sort_method == "height":
-            return sorted(self.rooms, key=lambda r: -r.height)
+            order = np.argsort(-height, kind='stable')
         elif self.sort_method == "perimeter":
-            return sorted(self.rooms, key=lambda r: -(r.width + r.height))
+            order = np.argsort(-(width + height), kind='stable')
         elif self.sort_method == "hybrid":
             # Weighted combination of adjacency and area
-            return sorted(self.rooms, key=lambda r: 
-                -(self.adjacency_weight * len(self.adjacency.get(r.id, [])) + 
-                 self.area_weight * r.area() / max(r.area() for r in self.rooms)))
+            order = np.argsort(-(self.adjacency_weight * degree +
+                                 self.area_weight * area / area.max()), kind='stable')
         elif self.sort_method == "degree_area":
             # Sort first by adjacency degree, then by area
-            return sorted(self.rooms, 
-                         key=lambda r: (-len(self.adjacency.get(r.id, [])), -r.area()))
-        return self.rooms  # No sorting
+            order = np.lexsort((-area, -degree))
+        else:
+            return self.rooms  # No sorting
+        return [self.rooms[i] for i in order]
     
     def _is_rotation_preferred(self, room, region):
         """
@@ -301,70 +454,126 @@ class RegionBasedPlacement:
         # For normal regions, prefer original orientation
         return False
     
-    def _get_region_fit_score(self, room, region, x, y):
+    def _place(self, room):
+        """Add a room to the placed rooms, recording its rectangle"""
+        count = len(self.placed_rooms)
+        if len(self._placed_rects) <= count:
+            # Only rooms placed outside place_rooms can outgrow the buffer
+            self._placed_rects = np.concatenate(
+                [self._placed_rect_array(), np.empty((max(len(self.rooms) - count, 1), 4))])
+        self._placed_rects[count] = room.get_rect()
+        requirements = self._requirements
+        if (requirements is not None and self._placed_rows_key is requirements
+                and count < len(self._placed_rows)):
+            self._placed_rows[count] = requirements[0][room.id]
+        else:
+            # Rebuilt from placed_rooms when next needed
+            self._placed_rows_key = None
+        self.placed_rooms.append(room)
+    
+    def _placed_rect_array(self):
         """
-        Calculate how well a room fits in a region at position (x,y).
-        Returns a score from 0 (poor fit) to 1 (perfect fit).
+        Return the (x, y, width, height) of the placed rooms as a view of a
+        buffer preallocated by clear_placements. Rows are written by _place;
+        removing the last placed room needs no update, as the view follows
+        the length of placed_rooms.
         """
-        if not region.contains(room, x, y):
-            return 0
-            
-        # Calculate free space on each side
-        left_space = x - region.x1
-        right_space = region.x2 - (x + room.width)
-        top_space = y - region.y1
-        bottom_space = region.y2 - (y + room.height)
-        
-        # Total free space
-        total_space = left_space + right_space + top_space + bottom_space
-        
-        # Region area and room area
-        region_area = region.area()
-        room_area = room.area()
-        
-        # Calculate fit score as ratio of room area to available area
-        fit_score = room_area / (room_area + total_space)
-        
-        return fit_score
-        
-    def _get_adjacency_score(self, room, position, orientation):
+        count = len(self.placed_rooms)
+        if len(self._placed_rects) < count:
+            self._placed_rects = np.array([room.get_rect() for room in self.placed_rooms],
+                                          dtype=float).reshape(-1, 4)
+        return self._placed_rects[:count]
+    
+    def _placed_row_array(self):
+        """
+        Return the index in rooms of each placed room, kept in step with
+        _placed_rect_array by _place. The indices are rebuilt when the
+        rooms or the requirements change.
+        """
+        requirements = self._requirement_arrays()
+        count = len(self.placed_rooms)
+        if self._placed_rows_key is not requirements or len(self._placed_rows) < count:
+            room_index = requirements[0]
+            rows = [room_index[placed_room.id] for placed_room in self.placed_rooms]
+            self._placed_rows = np.array(rows + [0] * (len(self.rooms) - count), dtype=np.intp)
+            self._placed_rows_key = requirements
+        return self._placed_rows[:count]
+    
+    def _adjacency_weights(self, room):
+        """
+        Weight of each placed room in the adjacency score of the given room:
+        1 for a required adjacency plus 0.5 for the inverse requirement.
         """
-        Calculate adjacency satisfaction score for a room at the given position.
-        Returns the number of satisfied adjacencies.
+        placed = self._placed_row_array()
+        return self._weight_matrix[self._requirements[0][room.id], placed]
+    
+    def _candidate_rects(self, room, candidates):
+        """Return the (x, y, width, height) of each candidate in its own orientation"""
+        width, height = (room.height, room.width) if room.rotated else (room.width, room.height)
+        return [(pos[0], pos[1], height, width) if is_rotated else (pos[0], pos[1], width, height)
+                for pos, _, is_rotated, _ in candidates]
+    
+    def _score_candidates(self, room, rects):
         """
-        score = 0
-        original_pos = (room.x, room.y, room.rotated)
+        Test each candidate rect for overlaps and score its adjacencies.
         
-        # Temporarily set the room position
-        room.x, room.y = position
-        if orientation != room.rotated:
-            room.rotate()
-            
-        # Check adjacency with already placed rooms
-        for placed_room in self.placed_rooms:
-            # Add score for required adjacencies
-            if placed_room.id in self.adjacency_graph.get(room.id, []):
-                if room.is_adjacent(placed_room):
-                    score += 1
-            
-            # Also consider adjacencies the other way around
-            if room.id in self.adjacency_graph.get(placed_room.id, []):
-                if room.is_adjacent(placed_room):
-                    score += 0.5  # half weight for inverse adjacencies
-                    
-        # Restore original position
-        room.x, room.y = original_pos[:2]
-        if orientation != original_pos[2]:
-            room.rotate()
+        Args:
+            room: Room being placed
+            rects: List of candidate (x, y, width, height) rectangles
             
-        return score
+        Returns:
+            Tuple (overlaps, scores) of arrays with whether each rect overlaps
+            a placed room and its adjacency score against the placed rooms
+        """
+        placed = self._placed_rect_array()
+        return score_candidates(np.array(rects, dtype=float).reshape(-1, 4),
+                                placed, self._adjacency_weights(room),
+                                parallel=self.parallel_search)
     
-    def _generate_candidate_positions(self, room):
+    def _score_placements(self, room, candidates):
         """
-        Generate candidate positions for a room based on adjacency requirements.
-        Returns a list of (position, region, is_rotated, score) tuples.
+        Overlap test, adjacency score and region fit score of each candidate
+        from _generate_candidate_positions, in one kernel pass.
+        
+        Returns:
+            Tuple (overlaps, adjacency_scores, fit_scores) of lists
         """
-        candidates = []
+        placed = self._placed_rect_array()
+        region_rows = {id(region): idx for idx, region in enumerate(self.regions)}
+        bounds = self._region_bounds()[[region_rows[id(region)] for _, region, _, _ in candidates]]
+        overlaps, scores, fits = score_placements(
+            np.array(self._candidate_rects(room, candidates), dtype=float).reshape(-1, 4),
+            bounds.reshape(-1, 4), placed, self._adjacency_weights(room),
+            parallel=self.parallel_search)
+        return overlaps.tolist(), scores.tolist(), fits.tolist()
+    
+    def _region_bounds(self):
+        """
+        Return the (x1, y1, x2, y2) of all regions as one float array.
+        It is built once per regions list and reused by every placement.
+        """
+        if self._bounds_regions is not self.regions:
+            self._bounds = np.array([(region.x1, region.y1, region.x2, region.y2)
+                                     for region in self.regions], dtype=float).reshape(-1, 4)
+            self._bounds_regions = self.regions
+        return self._bounds
+    
+    def _fit_scores(self, rects, bounds=None):
+        """Region fit score of each rect in each region: (len(rects), len(bounds)) array"""
+        if bounds is None:
+            bounds = self._region_bounds()
+        return region_fit_scores(np.array(rects, dtype=float).reshape(-1, 4),
+                                 bounds, parallel=self.parallel_search)
+    
+    def _sample_candidates(self, width, height, region_idx, is_rotated):
+        """Grid-sampled candidates for a width x height room within a region"""
+        region = self.regions[region_idx]
+        positions, fits = _grid_samples(region.x1, region.y1, region.x2, region.y2,
+                                        width, height, self.step_size)
+        return [(pos, region, is_rotated, fit_score) for pos, fit_score in zip(positions, fits)]
+    
+    def _anchor_rooms(self, room):
+        """Placed rooms whose sides the candidate positions of the room are taken from"""
         required_adjacencies = set(self.adjacency_graph.get(room.id, []))
         
         # Get rooms that should be adjacent to this one
@@ -377,56 +586,112 @@ class RegionBasedPlacement:
             # If there are placed rooms but none are adjacent requirements,
             # try positions near existing rooms anyway for better layouts
             adjacent_placed_rooms = self.placed_rooms
+        return adjacent_placed_rooms
+    
+    def _generate_candidate_positions(self, room, limit=None):
+        """
+        Generate candidate positions for a room based on adjacency requirements.
+        Returns a list of (position, region, is_rotated, score) tuples, best
+        first, keeping only the best `limit` of them unless limit is None.
+        """
+        candidates = []
+        adjacent_placed_rooms = self._anchor_rooms(room)
             
         if not adjacent_placed_rooms:
             # No rooms placed yet or no adjacency - use grid sampling
-            for region in self.regions:
+            for region_idx in range(len(self.regions)):
                 # Check original orientation
-                for pos in region.get_sample_positions(room, self.step_size):
-                    fit_score = self._get_region_fit_score(room, region, pos[0], pos[1])
-                    if fit_score > 0:
-                        candidates.append((pos, region, False, fit_score))
+                candidates.extend(self._sample_candidates(room.width, room.height, region_idx, False))
                 
-                # Check rotated orientation if allowed
+                # Check rotated orientation if allowed, without rotating the room
                 if self.optimize_rotations:
-                    room.rotate()
-                    for pos in region.get_sample_positions(room, self.step_size):
-                        fit_score = self._get_region_fit_score(room, region, pos[0], pos[1])
-                        if fit_score > 0:
-                            candidates.append((pos, region, True, fit_score))
-                    room.rotate()  # Restore original orientation
+                    candidates.extend(self._sample_candidates(room.height, room.width, region_idx, True))
         else:
-            # Generate positions adjacent to already placed rooms
-            for placed_room in adjacent_placed_rooms:
-                adj_positions = room.get_adjacent_positions(placed_room)
-                
-                for pos, is_rotated in [(p[:2], p[2]) for p in adj_positions]:
-                    # Check if position is valid in any region
-                    if is_rotated != room.rotated:
-                        room.rotate()
-                        
-                    for region in self.regions:
-                        fit_score = self._get_region_fit_score(room, region, pos[0], pos[1])
-                        if fit_score > 0:
-                            adj_score = self._get_adjacency_score(room, pos, is_rotated)
-                            # Combined score - adjacency is most important
-                            score = 0.8 * adj_score + 0.2 * fit_score
-                            candidates.append((pos, region, is_rotated, score))
-                    
-                    if is_rotated != room.rotated:
-                        room.rotate()  # Restore original orientation
+            # Generate positions adjacent to already placed rooms, all anchors
+            # at once. Positions are taken in the room's orientation when it is
+            # reached: its own for the first anchor, and rotated for the rest,
+            # since the room is left rotated to the last position of each anchor.
+            width, height = room.width, room.height
+            rotated_size = (width, height) if room.rotated else (height, width)
+            sizes = [(width, height)] + [rotated_size] * (len(adjacent_placed_rooms) - 1)
+            xs, ys, rotated, anchor_idx = adjacent_positions(
+                sizes, [placed_room.get_rect() for placed_room in adjacent_placed_rooms])
+            
+            # Each position is checked in its own orientation
+            flipped = rotated != room.rotated
+            rects = np.column_stack((xs, ys, np.where(flipped, height, width),
+                                     np.where(flipped, width, height)))
+            if not room.rotated:
+                room.rotate()
+            
+            # Check every position against every region in one batch; nonzero
+            # keeps the position-major, region-minor order
+            fits = self._fit_scores(rects)
+            position_idx, region_idx = np.nonzero(fits > 0)
+            
+            # Score adjacency for all fitting positions in one batch; the
+            # combined score weighs adjacency most
+            _, adj_scores = self._score_candidates(room, rects[position_idx])
+            scores = 0.8 * adj_scores + 0.2 * fits[position_idx, region_idx]
+            
+            # Coordinates of anchors at integer positions stay ints
+            int_x = np.array([type(r.x) is int for r in adjacent_placed_rooms])[anchor_idx[position_idx]]
+            int_y = np.array([type(r.y) is int for r in adjacent_placed_rooms])[anchor_idx[position_idx]]
+            candidates.extend(
+                ((int(x) if is_int_x else x, int(y) if is_int_y else y),
+                 self.regions[k], is_rotated, score)
+                for x, y, is_int_x, is_int_y, is_rotated, k, score in zip(
+                    xs[position_idx].tolist(), ys[position_idx].tolist(),
+                    int_x.tolist(), int_y.tolist(), rotated[position_idx].tolist(),
+                    region_idx.tolist(), scores.tolist()))
         
-        # Sort candidates by score
+        # Sort candidates by score; a partial heap sort is enough for a few
+        if limit is not None and len(candidates) > limit:
+            return heapq.nsmallest(limit, candidates, key=lambda x: -x[3])
         candidates.sort(key=lambda x: -x[3])
         return candidates
     
+    def _placement_key(self, room):
+        """Hashable (room_id, x, y, rotated) of a placed room"""
+        return (room.id, room.x, room.y, room.rotated)
+    
+    def _search_state(self, room_idx, prefix):
+        """
+        Hashable state the search below room_idx depends on: the placements
+        of the rooms up to and including room_idx, and the orientation of
+        every later room, which decides the sizes its candidates are taken in.
+        """
+        return (prefix, self._placement_key(self.rooms[room_idx]),
+                tuple(room.rotated for room in self.rooms[room_idx + 1:]))
+    
+    def _find_nogood(self, state):
+        """
+        Look up a search state that was already found to be a dead end.
+        Returns the orientations the later rooms were left in, or None.
+        """
+        orientations = self._nogoods.get(state)
+        if orientations is not None:
+            self._nogoods.move_to_end(state)
+        return orientations
+    
+    def _record_nogood(self, state, room_idx):
+        """Remember a dead end and the orientations it left the later rooms in"""
+        self._nogoods[state] = tuple(room.rotated for room in self.rooms[room_idx + 1:])
+        if len(self._nogoods) > self.max_nogoods:
+            self._nogoods.popitem(last=False)
+    
     def _place_room_backtracking(self, room_idx, depth=0, timeout_start=None):
         """
         Attempt to place rooms using backtracking.
         Returns True if successful, False otherwise.
+        
+        Dead ends are cached as nogoods. A rerun of the same search state
+        would fail again and leave the later rooms in the same orientations,
+        so a cached one is skipped and only its orientations are applied.
         """
         # Check timeout
         if timeout_start and time.time() - timeout_start > self.timeout:
+            self._timed_out = True
             return False
             
         # If all rooms are placed, we're done
@@ -436,36 +701,51 @@ class RegionBasedPlacement:
         current_room = self.rooms[room_idx]
         
         # Generate candidate positions
-        candidates = self._generate_candidate_positions(current_room)
+        candidates = self._generate_candidate_positions(current_room, self.top_k_candidates)
         
-        for position, region, is_rotated, score in candidates:
+        # Check all candidates for overlaps with placed rooms at once; the
+        # placed rooms are the same again after every backtrack
+        placed = self._placed_rect_array()
+        overlaps = first_overlaps(
+            np.array(self._candidate_rects(current_room, candidates), dtype=float).reshape(-1, 4),
+            placed) >= 0
+        prefix = tuple(self._placement_key(placed_room) for placed_room in self.placed_rooms)
+        
+        for (position, region, is_rotated, score), has_overlap in zip(candidates, overlaps.tolist()):
+            # Overlapping candidates are skipped without moving the room
+            if has_overlap:
+                continue
+            
             # Set room to current orientation
             if is_rotated != current_room.rotated:
                 current_room.rotate()
                 
-            # Check for overlaps with placed rooms
             current_room.x, current_room.y = position
             current_room.region = region
             
-            has_overlap = False
-            for placed_room in self.placed_rooms:
-                if current_room.overlaps(placed_room):
-                    has_overlap = True
-                    break
-                    
-            if not has_overlap:
-                # Valid placement, add to placed rooms
-                self.placed_rooms.append(current_room)
+            state = self._search_state(room_idx, prefix)
+            orientations = None if self._timed_out else self._find_nogood(state)
+            if orientations is not None:
+                for room, rotated in zip(self.rooms[room_idx + 1:], orientations):
+                    if room.rotated != rotated:
+                        room.rotate()
+                continue
+            
+            # Valid placement, add to placed rooms
+            self._place(current_room)
+            
+            # Try to place next room
+            if self._place_room_backtracking(room_idx + 1, depth + 1, timeout_start):
+                return True
                 
-                # Try to place next room
-                if self._place_room_backtracking(room_idx + 1, depth + 1, timeout_start):
-                    return True
-                    
-                # If we couldn't place the next room, backtrack
-                self.placed_rooms.remove(current_room)
+            # If we couldn't place the next room, backtrack
+            self.placed_rooms.remove(current_room)
+            if not self._timed_out:
+                self._record_nogood(state, room_idx)
                 
-        # Restore original orientation
-        if current_room.rotated != (self.rooms[room_idx].rotated):
+        # The room keeps the orientation of the last candidate, as when
+        # every candidate was applied; later candidate lists depend on it
+        if candidates and current_room.rotated != candidates[-1][2]:
             current_room.rotate()
             
         current_room.x = None
@@ -481,10 +761,21 @@ class RegionBasedPlacement:
         """
         self.clear_placements()
         
+        # Dense packing takes the rooms largest first, whatever the sort method
+        if self.use_first_fit_decreasing:
+            return self._place_rooms_first_fit()
+        
         # Sort rooms by the selected method
         sorted_rooms = self.sort_rooms()
         self.rooms = sorted_rooms  # Use the sorted order for backtracking
         
+        # A zero timeout means greedy only, so skip the backtracking setup
+        if self.timeout <= 0:
+            return self._place_rooms_greedy(sorted_rooms)
+            
+        self._nogoods.clear()
+        self._timed_out = False
+        
         # If using backtracking algorithm
         timeout_start = time.time()
         if self._place_room_backtracking(0, timeout_start=timeout_start):
@@ -500,78 +791,286 @@ class RegionBasedPlacement:
         Returns the number of successfully placed rooms.
         """
         for room in sorted_rooms:
-            best_score = -1
-            best_pos = None
-            best_rot = False
-            best_region = None
-            
             # Generate and evaluate candidate positions
             candidates = self._generate_candidate_positions(room)
+            if not candidates:
+                continue
             
-            for position, region, is_rotated, score in candidates:
-                # Set room to current orientation
-                if is_rotated != room.rotated:
-                    room.rotate()
-                    
-                # Check for overlaps with placed rooms
-                room.x, room.y = position
-                
-                overlap = False
-                for placed_room in self.placed_rooms:
-                    if room.overlaps(placed_room):
-                        overlap = True
-                        break
-                        
-                if not overlap:
-                    # Calculate final score
-                    adjacency_score = self._get_adjacency_score(room, position, is_rotated)
-                    region_score = self._get_region_fit_score(room, region, position[0], position[1])
-                    
-                    # Combined score - adjacency is most important
-                    combined_score = 0.8 * adjacency_score + 0.2 * region_score
-                    
-                    if combined_score > best_score:
-                        best_score = combined_score
-                        best_pos = position
-                        best_rot = is_rotated
-                        best_region = region
-                
-                # Restore original orientation for next candidate
-                if is_rotated != room.rotated:
-                    room.rotate()
+            # Overlap, adjacency and region fit checks for all candidates in one pass
+            overlaps, adjacency_scores, region_scores = self._score_placements(room, candidates)
+            
+            # Combined score - adjacency is most important; the first
+            # non-overlapping candidate with the best score wins
+            combined_scores = 0.8 * np.asarray(adjacency_scores) + 0.2 * np.asarray(region_scores)
+            combined_scores[np.asarray(overlaps, dtype=bool)] = -np.inf
+            best = int(np.argmax(combined_scores))
             
-            # Apply best placement if found
-            if best_pos:
+            if np.isneginf(combined_scores[best]):
+                # No position fits; the room is left as at the last candidate
+                best_pos, _, best_rot, _ = candidates[-1]
                 if best_rot != room.rotated:
                     room.rotate()
                 room.x, room.y = best_pos
-                room.region = best_region
-                self.placed_rooms.append(room)
+                continue
+            
+            # Apply the best placement
+            best_pos, best_region, best_rot, _ = candidates[best]
+            if best_rot != room.rotated:
+                room.rotate()
+            room.x, room.y = best_pos
+            room.region = best_region
+            self._place(room)
+                
+        return len(self.placed_rooms)
+    
+    def _place_rooms_first_fit(self):
+        """
+        Place rooms first-fit decreasing: in order of decreasing area, each
+        room goes to the first grid position, region by region, where it
+        fits without overlapping a placed room. Rooms of similar area are
+        then swapped where that satisfies more adjacencies.
+        Returns the number of successfully placed rooms.
+        """
+        areas = np.array([room.area() for room in self.rooms], dtype=float)
+        for idx in np.argsort(-areas, kind='stable'):
+            room = self.rooms[idx]
+            placement = self._first_fit_position(room)
+            if placement is None:
+                continue
                 
+            pos, region, is_rotated = placement
+            if is_rotated != room.rotated:
+                room.rotate()
+            room.x, room.y = pos
+            room.region = region
+            self._place(room)
+            
+        self._swap_for_adjacency()
         return len(self.placed_rooms)
     
+    def _first_fit_position(self, room):
+        """
+        First (position, region, is_rotated) where the room fits without
+        overlap, trying the regions in order and the room's own orientation
+        before the rotated one; None if it fits nowhere.
+        """
+        orientations = [(room.width, room.height, room.rotated)]
+        if self.optimize_rotations:
+            orientations.append((room.height, room.width, not room.rotated))
+            
+        placed = self._placed_rect_array()
+        for region in self.regions:
+            for width, height, is_rotated in orientations:
+                positions, _ = _grid_samples(region.x1, region.y1, region.x2, region.y2,
+                                             width, height, self.step_size)
+                if not positions:
+                    continue
+                rects = np.column_stack((np.array(positions, dtype=float),
+                                         np.full((len(positions), 2), (width, height), dtype=float)))
+                free = np.flatnonzero(first_overlaps(rects, placed) < 0)
+                if free.size:
+                    return positions[free[0]], region, is_rotated
+        return None
+    
+    def _swap_for_adjacency(self, area_tolerance=0.1):
+        """
+        Swap the positions of placed rooms whose areas differ by at most
+        area_tolerance while that raises the number of satisfied adjacencies.
+        A swap is kept only if both rooms still fit a region without overlap.
+        """
+        satisfied = self.get_adjacency_score()[0]
+        improved = True
+        while improved:
+            improved = False
+            for i, j in itertools.combinations(range(len(self.placed_rooms)), 2):
+                room1, room2 = self.placed_rooms[i], self.placed_rooms[j]
+                area1, area2 = room1.area(), room2.area()
+                if abs(area1 - area2) > area_tolerance * max(area1, area2):
+                    continue
+                    
+                swapped = self._swap_if_valid(i, j)
+                if swapped is None:
+                    continue
+                score = self.get_adjacency_score()[0]
+                if score > satisfied:
+                    satisfied = score
+                    improved = True
+                else:
+                    self._apply_swap(i, j, *swapped)
+    
+    def _swap_if_valid(self, i, j):
+        """
+        Swap the positions of placed rooms i and j if both then fit a region
+        without overlapping any placed room. Returns the previous
+        ((x, y), region) of each room for undoing the swap, or None if the
+        swap was not made.
+        """
+        room1, room2 = self.placed_rooms[i], self.placed_rooms[j]
+        rects = self._placed_rect_array().copy()
+        rects[i, :2], rects[j, :2] = (room2.x, room2.y), (room1.x, room1.y)
+        
+        # Neither room may overlap the other or any room left in place
+        others = np.delete(rects, [i, j], axis=0)
+        moved = rects[[i, j]]
+        if (first_overlaps(moved, others) >= 0).any() or first_overlaps(moved[:1], moved[1:])[0] >= 0:
+            return None
+        fits = self._fit_scores(moved) > 0
+        if not fits.any(axis=1).all():
+            return None
+            
+        regions = [self.regions[k] for k in fits.argmax(axis=1)]
+        previous = ((room1.x, room1.y), room1.region), ((room2.x, room2.y), room2.region)
+        self._apply_swap(i, j, ((room2.x, room2.y), regions[0]), ((room1.x, room1.y), regions[1]))
+        return previous
+    
+    def _apply_swap(self, i, j, placement1, placement2):
+        """Put placed rooms i and j at the given ((x, y), region), keeping the rect buffer in step"""
+        for idx, ((x, y), region) in ((i, placement1), (j, placement2)):
+            room = self.placed_rooms[idx]
+            room.x, room.y = x, y
+            room.region = region
+            self._placed_rects[idx] = room.get_rect()
+    
     def get_adjacency_score(self):
         """
         Calculate the adjacency satisfaction score.
         Returns tuple (satisfied, total, ratio)
         """
-        satisfied = 0
-        total = 0
+        # All placed-pair adjacencies at once, from (x, y, width, height) arrays
+        rects = np.array([room.get_rect() for room in self.placed_rooms],
+                         dtype=float).reshape(-1, 4)
+        adjacent = pairwise_adjacent(rects, rects)
+        
+        # Every requirement counts; only placed neighbors can be satisfied
+        _, required, totals = self._requirement_arrays()
+        placed = self._placed_row_array()
+        total = int(totals[placed].sum())
+        
+        # A neighbor is matched against the first placed room with its id
+        _, first = np.unique(placed, return_index=True)
+        counts = required[np.ix_(placed, placed[first])]
+        if counts.size and counts.max() > 1:
+            # A neighbor listed more than once counts once per listing
+            satisfied = int((counts * adjacent[:, first]).sum())
+        else:
+            # 0/1 counts: a branchless AND of the two masks and a bit count
+            satisfied = int(np.count_nonzero(counts.view(bool) & adjacent[:, first]))
         
-        for room1 in self.placed_rooms:
-            required_neighbors = self.adjacency.get(room1.id, [])
-            for neighbor_id in required_neighbors:
-                total += 1
-                # Find the neighbor room
-                for room2 in self.placed_rooms:
-                    if room2.id == neighbor_id and room1.is_adjacent(room2):
-                        satisfied += 1
-                        break
-                        
         ratio = satisfied / total if total > 0 else 1.0
         return (satisfied, total, ratio)
     
-    def visualize(self, show_adjacency=True, title=None, axes=None):
+    def get_stats_text(self):
+        """Return the placement statistics shown under the floorplan"""
+        placed_count = len(self.placed_rooms)
+        total_count = len(self.rooms)
+        adjacency_score = self.get_adjacency_score()
+        
+        return (
+            f"Statistics:\n"
+            f"- Rooms placed: {placed_count}/{total_count}\n"
+            f"- Adjacency satisfaction: {adjacency_score[0]}/{adjacency_score[1]} "
+            f"({adjacency_score[2]:.2f})"
+        )
+    
+    def get_adjacency_edges(self, room_centers):
+        """
+        Split the required adjacencies between placed rooms by status.
+        
+        Args:
+            room_centers: Dictionary mapping room ids to (x, y) centers
+            
+        Returns:
+            Tuple (satisfied, unsatisfied) of ((x1, y1), (x2, y2)) segment lists
+        """
+        satisfied_edges = []
+        unsatisfied_edges = []
+        
+        # A neighbor is matched against the first placed room with its id
+        first_placed = {}
+        for idx, room in enumerate(self.placed_rooms):
+            first_placed.setdefault(room.id, idx)
+            
+        # All placed-pair adjacencies at once instead of a scan per requirement
+        rects = np.array([room.get_rect() for room in self.placed_rooms],
+                         dtype=float).reshape(-1, 4)
+        adjacent = pairwise_adjacent(rects, rects)
+        
+        for idx, room1 in enumerate(self.placed_rooms):
+            required_neighbors = self.adjacency.get(room1.id, [])
+            for neighbor_id in required_neighbors:
+                neighbor_idx = first_placed.get(neighbor_id)
+                if neighbor_idx is None:
+                    continue
+                    
+                if room1.id in room_centers and neighbor_id in room_centers:
+                    x1, y1 = room_centers[room1.id]
+                    x2, y2 = room_centers[neighbor_id]
+                    
+                    if adjacent[idx, neighbor_idx]:
+                        satisfied_edges.append(((x1, y1), (x2, y2)))
+                    else:
+                        unsatisfied_edges.append(((x1, y1), (x2, y2)))
+                            
+        return satisfied_edges, unsatisfied_edges
+    
+    def get_render_data(self):
+        """
+        Collect the plain geometry needed to draw the current placement.
+        Only NumPy arrays and strings are built, so this is safe to run
+        off the GUI thread.
+        
+        Returns:
+            Dictionary with room 'ids', 'rects' (x, y, width, height),
+            'centers' and 'colors', NaN-separated 'satisfied' and
+            'unsatisfied' (xs, ys) polylines, and the 'stats' text
+        """
+        ids = []
+        rects = []
+        room_colors = []
+        for i, room in enumerate(self.placed_rooms):
+            if room.x is not None and room.y is not None:
+                ids.append(room.id)
+                rects.append((room.x, room.y, room.width, room.height))
+                room_colors.append(ROOM_COLORS[i % len(ROOM_COLORS)])
+                
+        rects = np.array(rects, dtype=float).reshape(-1, 4)
+        centers = rects[:, :2] + rects[:, 2:] / 2
+        room_centers = {room_id: tuple(center) for room_id, center in zip(ids, centers)}
+        satisfied_edges, unsatisfied_edges = self.get_adjacency_edges(room_centers)
+        
+        return {
+            'ids': ids,
+            'rects': rects,
+            'centers': centers,
+            'colors': np.array(room_colors).reshape(-1, 4),
+            'satisfied': edges_to_polyline(satisfied_edges),
+            'unsatisfied': edges_to_polyline(unsatisfied_edges),
+            'stats': self.get_stats_text(),
+        }
+    
+    def draw_adjacency(self, axes, render_data):
+        """
+        Draw the required adjacencies between placed rooms.
+        
+        Args:
+            axes: Matplotlib axes to draw on
+            render_data: Dictionary returned by get_render_data
+            
+        Returns:
+            List with the satisfied and unsatisfied line artists
+        """
+        # Plot satisfied adjacencies
+        satisfied_line, = axes.plot(*render_data['satisfied'], color='green',
+                                    linestyle='-', linewidth=2, alpha=0.7)
+        
+        # Plot unsatisfied adjacencies
+        unsatisfied_line, = axes.plot(*render_data['unsatisfied'], color='red',
+                                      linestyle=':', linewidth=1, alpha=0.7)
+        
+        return [satisfied_line, unsatisfied_line]
+    
+    def visualize(self, show_adjacency=True, title=None, axes=None, render_data=None,
+                  show_legend=True):
         """
         Visualize the placement results.
         
@@ -579,121 +1078,79 @@ class RegionBasedPlacement:
             show_adjacency: Whether to draw adjacency connections
             title: Title for the plot
             axes: Matplotlib axes to draw on (if None, creates a new figure)
+            render_data: Precomputed result of get_render_data (computed
+                here if None)
+            show_legend: Whether to draw the legend
+            
+        Returns:
+            Dictionary with the placement-dependent artists ('rooms'
+            collection, 'labels', 'edges' and 'stats') so callers can
+            update them without redrawing the whole figure
         """
+        # matplotlib is only loaded once something is drawn
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PolyCollection
+        
         if axes is None:
             fig, axes = plt.subplots(figsize=(10, 8))
             show_fig = True
         else:
             show_fig = False
+            
+        if render_data is None:
+            render_data = self.get_render_data()
         
-        # Plot regions
-        for i, region in enumerate(self.regions):
-            rect = patches.Rectangle(
-                (region.x1, region.y1), 
-                region.x2 - region.x1, 
-                region.y2 - region.y1,
-                linewidth=2,
-                edgecolor='blue',
-                facecolor='lightblue',
-                alpha=0.2,
-                label=f"Region {i+1}" if i == 0 else ""
-            )
-            axes.add_patch(rect)
-        
-        # Colors for rooms
-        colors = plt.cm.tab10(np.linspace(0, 1, 10))
+        # Plot regions as a single collection
+        bounds = self._region_bounds()
+        region_collection = PolyCollection(
+            rects_to_polygons(np.hstack([bounds[:, :2], bounds[:, 2:] - bounds[:, :2]])),
+            linewidths=2,
+            joinstyle='miter',
+            edgecolors='blue',
+            facecolors='lightblue',
+            alpha=0.2,
+            label="Region 1" if self.regions else ""
+        )
+        axes.add_collection(region_collection)
         
-        # Store room centers for adjacency lines
-        room_centers = {}
+        # Plot placed rooms as a single collection
+        room_collection = PolyCollection(
+            rects_to_polygons(render_data['rects']),
+            linewidths=1,
+            edgecolors='black',
+            facecolors=render_data['colors'],
+            alpha=0.7
+        )
+        axes.add_collection(room_collection)
         
-        # Plot placed rooms
-        for i, room in enumerate(self.placed_rooms):
-            if room.x is not None and room.y is not None:
-                color = colors[i % len(colors)]
-                rect = patches.Rectangle(
-                    (room.x, room.y),
-                    room.width,
-                    room.height,
-                    linewidth=1,
-                    edgecolor='black',
-                    facecolor=color,
-                    alpha=0.7
-                )
-                axes.add_patch(rect)
-                
-                # Store center for adjacency lines
-                center_x = room.x + room.width/2
-                center_y = room.y + room.height/2
-                room_centers[room.id] = (center_x, center_y)
-                
-                # Add room label
-                axes.text(
-                    center_x,
-                    center_y,
-                    f"{room.id}",
-                    ha='center',
-                    va='center',
-                    fontsize=10,
-                    fontweight='bold'
-                )
+        room_labels = []
+        for room_id, (center_x, center_y) in zip(render_data['ids'], render_data['centers']):
+            # Add room label
+            label = axes.text(
+                center_x,
+                center_y,
+                f"{room_id}",
+                ha='center',
+                va='center',
+                fontsize=10,
+                fontweight='bold'
+            )
+            room_labels.append(label)
         
         # Draw adjacency connections
+        edge_lines = []
         if show_adjacency:
-            satisfied_edges = []
-            unsatisfied_edges = []
-            
-            for room1 in self.placed_rooms:
-                required_neighbors = self.adjacency.get(room1.id, [])
-                for neighbor_id in required_neighbors:
-                    # Find the neighbor room
-                    neighbor_placed = False
-                    adjacency_satisfied = False
-                    
-                    for room2 in self.placed_rooms:
-                        if room2.id == neighbor_id:
-                            neighbor_placed = True
-                            if room1.is_adjacent(room2):
-                                adjacency_satisfied = True
-                            break
-                    
-                    if neighbor_placed:
-                        if room1.id in room_centers and neighbor_id in room_centers:
-                            x1, y1 = room_centers[room1.id]
-                            x2, y2 = room_centers[neighbor_id]
-                            
-                            if adjacency_satisfied:
-                                satisfied_edges.append(((x1, y1), (x2, y2)))
-                            else:
-                                unsatisfied_edges.append(((x1, y1), (x2, y2)))
-            
-            # Plot satisfied adjacencies
-            for (x1, y1), (x2, y2) in satisfied_edges:
-                axes.plot([x1, x2], [y1, y2], color='green', linestyle='-', linewidth=2, alpha=0.7)
-                
-            # Plot unsatisfied adjacencies
-            for (x1, y1), (x2, y2) in unsatisfied_edges:
-                axes.plot([x1, x2], [y1, y2], color='red', linestyle=':', linewidth=1, alpha=0.7)
+            edge_lines = self.draw_adjacency(axes, render_data)
             
             # Add legend for adjacency lines
             axes.plot([], [], color='green', linestyle='-', linewidth=2, label='Satisfied adjacency')
             axes.plot([], [], color='red', linestyle=':', linewidth=1, label='Unsatisfied adjacency')
             
-        # Calculate and show statistics
-        placed_count = len(self.placed_rooms)
-        total_count = len(self.rooms)
-        adjacency_score = self.get_adjacency_score()
-        
         # Add statistics text
-        stats_text = (
-            f"Statistics:\n"
-            f"- Rooms placed: {placed_count}/{total_count}\n"
-            f"- Adjacency satisfaction: {adjacency_score[0]}/{adjacency_score[1]} "
-            f"({adjacency_score[2]:.2f})"
-        )
-        axes.text(
+        stats_text = axes.text(
             0,
             -1,
-            stats_text,
+            render_data['stats'],
             fontsize=9,
             horizontalalignment='left',
             verticalalignment='top'
@@ -707,7 +1164,8 @@ class RegionBasedPlacement:
             
         # Set axis properties
         axes.set_aspect('equal')
-        axes.legend(loc='upper right')
+        if show_legend:
+            axes.legend(loc='upper right')
         
         # Set limits with padding
         all_x = [r.x1 for r in self.regions] + [r.x2 for r in self.regions]
@@ -720,66 +1178,100 @@ class RegionBasedPlacement:
         if show_fig:
             plt.tight_layout()
             plt.show()
+            
+        return {
+            'rooms': room_collection,
+            'labels': room_labels,
+            'edges': edge_lines,
+            'stats': stats_text,
+        }
 
-def create_h_shape_regions(width, height, corridor_width):
+@lru_cache(maxsize=512)
+def _grid_samples(x1, y1, x2, y2, width, height, step_size):
     """
-    Create regions for an H-shaped layout.
+    Grid-sampled positions of a width x height room in the region
+    (x1, y1, x2, y2) where it fits, with their fit scores.
     
-    Args:
-        width: Total width of the H-shape
-        height: Total height of the H-shape
-        corridor_width: Width of the horizontal corridor
-        
-    Returns:
-        List of PlotRegion objects defining the H-shape
+    Cached on the plain numbers, since every room of the same size is
+    sampled over the same grid; returns a tuple (positions, fits) of
+    tuples so no mutable state is shared.
+    """
+    region = PlotRegion(x1, y1, x2, y2)
+    xs, ys = region.get_sample_axes(width, height, step_size)
+    xs, ys = (axis.ravel() for axis in np.meshgrid(xs, ys, indexing='ij'))
+    fits = region.batch_fit_scores(width, height, xs, ys)
+    keep = fits > 0
+    return (tuple(zip(xs[keep].tolist(), ys[keep].tolist())), tuple(fits[keep].tolist()))
+
+@lru_cache(maxsize=256)
+def _h_shape_bounds(width, height, corridor_width):
+    """
+    Compute the H-shape region geometry.
+    
+    Cached on the (hashable) dimensions; returns a tuple of
+    (x1, y1, x2, y2, name) tuples so no mutable state is shared.
     """
     left_width = right_width = width / 3
     corridor_y = (height - corridor_width) / 2
     
     # Left vertical region
-    left_region = PlotRegion(0, 0, left_width, height, "Left Wing")
+    left_region = (0, 0, left_width, height, "Left Wing")
     
     # Middle horizontal corridor
-    middle_region = PlotRegion(
+    middle_region = (
         left_width, corridor_y,
         width - right_width, corridor_y + corridor_width,
         "Corridor"
     )
     
     # Right vertical region
-    right_region = PlotRegion(
+    right_region = (
         width - right_width, 0,
         width, height,
         "Right Wing"
     )
     
     # Add overlapping corner regions for more flexibility
-    upper_left = PlotRegion(
+    upper_left = (
         left_width * 0.7, corridor_y + corridor_width,
         left_width * 1.3, height,
         "Upper Left Corner"
     )
     
-    lower_left = PlotRegion(
+    lower_left = (
         left_width * 0.7, 0,
         left_width * 1.3, corridor_y,
         "Lower Left Corner"
     )
     
-    upper_right = PlotRegion(
+    upper_right = (
         width - right_width * 1.3, corridor_y + corridor_width,
         width - right_width * 0.7, height,
         "Upper Right Corner"
     )
     
-    lower_right = PlotRegion(
+    lower_right = (
         width - right_width * 1.3, 0, 
         width - right_width * 0.7, corridor_y,
         "Lower Right Corner"
     )
     
-    return [left_region, middle_region, right_region, 
-            upper_left, lower_left, upper_right, lower_right]
+    return (left_region, middle_region, right_region, 
+            upper_left, lower_left, upper_right, lower_right)
+
+def create_h_shape_regions(width, height, corridor_width):
+    """
+    Create regions for an H-shaped layout.
+    
+    Args:
+        width: Total width of the H-shape
+        height: Total height of the H-shape
+        corridor_width: Width of the horizontal corridor
+        
+    Returns:
+        List of PlotRegion objects defining the H-shape
+    """
+    return [PlotRegion(*bounds) for bounds in _h_shape_bounds(width, height, corridor_width)]
 
 def main():
     # Define basic room data
@@ -815,9 +1307,9 @@ def main():
     strategy.area_weight = 0.3
     
     # Place rooms
-    start_time = time.time()
+    start_time = time.perf_counter()
     num_placed = strategy.place_rooms()
-    elapsed_time = time.time() - start_time
+    elapsed_time = time.perf_counter() - start_time
     
     print(f"Placed {num_placed} out of {len(rooms)} rooms in {elapsed_time:.2f} seconds.")
     
@@ -825,14 +1317,15 @@ def main():
     satisfied, total, ratio = strategy.get_adjacency_score()
     print(f"Adjacency satisfaction: {satisfied}/{total} ({ratio:.2f})")
     
-    # Print room placements
-    for room in strategy.placed_rooms:
-        print(f"Room {room.id} ({room.name}): Position ({room.x}, {room.y}), "
-              f"Dimensions {room.width}x{room.height} "
-              f"(Rotated: {room.rotated})")
+    # Print room placements in one write
+    if strategy.placed_rooms:
+        print("\n".join(f"Room {room.id} ({room.name}): Position ({room.x}, {room.y}), "
+                        f"Dimensions {room.width}x{room.height} "
+                        f"(Rotated: {room.rotated})" for room in strategy.placed_rooms))
     
-    # Visualize
-    strategy.visualize()
+    # Visualize, unless only the placement is wanted (e.g. timing runs)
+    if not os.environ.get("GPLAN_NOVIZ"):
+        strategy.visualize()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+The nogood cache must only skip searches that would fail anyway, so
+backtracking gives the same placements with and without it.
+"""
+
+import random
+
+import pytest
+
+from strategy import RegionBasedPlacement, Room, create_h_shape_regions
+
+
+def random_placement(seed, max_nogoods=None):
+    """Backtrack six random rooms with random adjacencies into an H-shape"""
+    rng = random.Random(seed)
+    rooms = [Room(i + 1, rng.randint(2, 6), rng.randint(2, 6)) for i in range(6)]
+    adjacency = {}
+    for _ in range(rng.randint(4, 9)):
+        a, b = rng.sample(range(1, 7), 2)
+        if b not in adjacency.setdefault(a, []):
+            adjacency[a].append(b)
+
+    strategy = RegionBasedPlacement(rooms, create_h_shape_regions(15, 15, 3), adjacency)
+    strategy.set_sort_method("adjacency")
+    strategy.timeout = 30
+    if max_nogoods is not None:
+        strategy.max_nogoods = max_nogoods
+    placed = strategy.place_rooms()
+    return placed, sorted((room.id, room.x, room.y, room.rotated) for room in strategy.placed_rooms)
+
+
+# Seeds where nogoods keyed on the placements alone pruned live subtrees;
+# 322 fails to place every room and falls back to greedy
+@pytest.mark.parametrize("seed", [36, 170, 215, 259, 318, 322])
+def test_nogoods_do_not_change_placement(seed):
+    assert random_placement(seed) == random_placement(seed, max_nogoods=0)
@@ -0,0 +1,151 @@
+"""
+The numba kernels and their NumPy fallbacks must agree with each other and
+with the scalar Room.overlaps / are_adjacent predicates they replace.
+"""
+
+import numpy as np
+import pytest
+
+import placement_kernel as pk
+from strategy import Room, are_adjacent, create_h_shape_regions
+
+requires_numba = pytest.mark.skipif(not pk.NUMBA_AVAILABLE, reason="numba is not installed")
+
+
+def random_rects(rng, count, span=12):
+    """Rects on a half-unit grid, so edges often touch or coincide exactly"""
+    xy = rng.integers(0, 2 * span, size=(count, 2)) / 2
+    size = rng.integers(1, 8, size=(count, 2)) / 2
+    return np.column_stack((xy, size)).astype(np.float64)
+
+
+def as_room(rect):
+    room = Room(0, rect[2], rect[3])
+    room.x, room.y = rect[0], rect[1]
+    return room
+
+
+@pytest.fixture(params=range(5))
+def rects(request):
+    rng = np.random.default_rng(request.param)
+    return random_rects(rng, 60), random_rects(rng, 25), rng.integers(0, 3, 25) / 2.0
+
+
+def scalar_scores(candidates, placed, weights):
+    """Overlap flags and adjacency scores from the scalar predicates"""
+    overlaps, scores = [], []
+    for a in candidates:
+        room = as_room(a)
+        overlaps.append(any(room.overlaps(as_room(b)) for b in placed))
+        scores.append(sum(w for b, w in zip(placed, weights) if are_adjacent(tuple(a), tuple(b))))
+    return np.array(overlaps), np.array(scores)
+
+
+def scalar_first_overlaps(a, b):
+    return np.array([next((j for j, rb in enumerate(b) if as_room(ra).overlaps(as_room(rb))), -1)
+                     for ra in a])
+
+
+def h_shape_fits(seed):
+    """
+    Candidates in and around the regions of a 0.7-scaled H-shape, whose corners
+    are not integers, with many positions flush against a region edge
+    """
+    rng = np.random.default_rng(seed)
+    regions = create_h_shape_regions(25 * 0.7, 17 * 0.7, 3 * 0.7)
+    rows = []
+    for region in regions:
+        for w, h in rng.integers(1, 10, size=(8, 2)) * 0.7:
+            xs = [region.x1, region.x2 - w, *rng.uniform(region.x1 - 1, region.x2, 3)]
+            ys = [region.y1, region.y2 - h, *rng.uniform(region.y1 - 1, region.y2, 3)]
+            rows.extend((x, y, w, h) for x in xs for y in ys)
+    return np.array(rows), regions
+
+
+def scalar_fit(rect, region):
+    """The region fit score, computed one room at a time"""
+    x, y, w, h = rect
+    if not region.contains(Room(0, w, h), x, y):
+        return 0.0
+    total_space = (x - region.x1) + (region.x2 - (x + w)) + (y - region.y1) + (region.y2 - (y + h))
+    return w * h / (w * h + total_space)
+
+
+def region_array(regions):
+    return np.array([(r.x1, r.y1, r.x2, r.y2) for r in regions])
+
+
+def test_pairwise_adjacent_matches_are_adjacent(rects):
+    a, b, _ = rects
+    expected = np.array([[are_adjacent(tuple(ra), tuple(rb)) for rb in b] for ra in a])
+    np.testing.assert_array_equal(pk.pairwise_adjacent(a, b), expected)
+
+
+def test_score_candidates_np_matches_scalar(rects):
+    candidates, placed, weights = rects
+    overlaps, scores = pk._score_candidates_np(candidates, placed, weights)
+    expected_overlaps, expected_scores = scalar_scores(candidates, placed, weights)
+    np.testing.assert_array_equal(overlaps, expected_overlaps)
+    np.testing.assert_array_equal(scores, expected_scores)
+
+
+@requires_numba
+@pytest.mark.parametrize("parallel", [False, True])
+def test_score_candidates_nb_matches_np(rects, parallel):
+    candidates, placed, weights = rects
+    expected_overlaps, expected_scores = pk._score_candidates_np(candidates, placed, weights)
+    overlaps, scores = pk.score_candidates(candidates, placed, weights, parallel=parallel)
+    np.testing.assert_array_equal(overlaps, expected_overlaps)
+    np.testing.assert_array_equal(scores, expected_scores)
+
+
+def test_first_overlaps_np_matches_scalar(rects):
+    a, b, _ = rects
+    np.testing.assert_array_equal(pk._first_overlaps_np(a, b), scalar_first_overlaps(a, b))
+
+
+@requires_numba
+def test_first_overlaps_nb_matches_np(rects):
+    a, b, _ = rects
+    np.testing.assert_array_equal(pk._first_overlaps_nb(a, b), pk._first_overlaps_np(a, b))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_region_fit_scores_np_matches_scalar(seed):
+    rects, regions = h_shape_fits(seed)
+    expected = np.array([[scalar_fit(rect, region) for region in regions] for rect in rects])
+    assert expected.any() and not expected.all()
+    np.testing.assert_array_equal(pk._region_fit_scores_np(rects, region_array(regions)), expected)
+
+
+@requires_numba
+@pytest.mark.parametrize("parallel", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_region_fit_scores_nb_matches_np(seed, parallel):
+    rects, regions = h_shape_fits(seed)
+    bounds = region_array(regions)
+    np.testing.assert_array_equal(pk.region_fit_scores(rects, bounds, parallel=parallel),
+                                  pk._region_fit_scores_np(rects, bounds))
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_score_placements_fits_match_scalar(parallel):
+    rects, regions = h_shape_fits(0)
+    # Give each candidate one of the regions, in turn
+    own = [regions[i % len(regions)] for i in range(len(rects))]
+    placed = random_rects(np.random.default_rng(0), 10)
+    weights = np.ones(len(placed))
+    overlaps, scores, fits = pk.score_placements(rects, region_array(own), placed, weights,
+                                                 parallel=parallel)
+    expected_overlaps, expected_scores = pk._score_candidates_np(rects, placed, weights)
+    np.testing.assert_array_equal(overlaps, expected_overlaps)
+    np.testing.assert_array_equal(scores, expected_scores)
+    np.testing.assert_array_equal(fits, [scalar_fit(rect, region) for rect, region in zip(rects, own)])
+
+
+def test_no_placed_rooms():
+    candidates = random_rects(np.random.default_rng(0), 4)
+    placed = np.empty((0, 4))
+    overlaps, scores = pk.score_candidates(candidates, placed, np.empty(0))
+    assert not overlaps.any() and not scores.any()
+    np.testing.assert_array_equal(pk.first_overlaps(candidates, placed), [-1] * 4)